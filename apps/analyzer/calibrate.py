@@ -8,130 +8,239 @@ import json
 import os
 import sqlite3
 import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Any
-from sklearn.linear_model import LogisticRegression
-from sklearn.calibration import CalibratedClassifierCV
-import matplotlib.pyplot as plt
-matplotlib.use('Agg')  # Use non-interactive backend
+from datetime import datetime
+from typing import Dict, Tuple, Any
+from scipy.special import expit
+
+# Optional orjson for fast JSON serialization; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional numba JIT for the Platt Newton inner loop; the vectorized NumPy
+# path is used when numba is not installed
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    import math
+
+    @njit(cache=True, fastmath=True)
+    def _platt_newton(x, tsum, cnt, max_iter, tol):
+        """Single-pass gradient + Hessian accumulation with no temporaries
+
+        Operates on unique x values with per-value counts and summed targets.
+        """
+        a = 0.0
+        b = 0.0
+        for _ in range(max_iter):
+            g0 = g1 = h00 = h01 = h11 = 0.0
+            for i in range(x.shape[0]):
+                p = 1.0 / (1.0 + math.exp(-(a * x[i] + b)))
+                d = cnt[i] * p - tsum[i]
+                w = cnt[i] * p * (1.0 - p)
+                g0 += d * x[i]
+                g1 += d
+                h00 += w * x[i] * x[i]
+                h01 += w * x[i]
+                h11 += w
+            det = (h00 + 1e-8) * (h11 + 1e-8) - h01 * h01
+            da = ((h11 + 1e-8) * g0 - h01 * g1) / det
+            db = ((h00 + 1e-8) * g1 - h01 * g0) / det
+            a -= da
+            b -= db
+            if abs(da) < tol and abs(db) < tol:
+                break
+        return a, b
 
 class ModelCalibrator:
     """Online calibration for model probabilities"""
     
-    def __init__(self, db_path: str = "data/rugs.sqlite", 
+    def __init__(self, db_path: str = "data/rugs.sqlite",
                  lookback_rounds: int = 200):
         self.db_path = db_path
         self.lookback_rounds = lookback_rounds
         self.calibration_params = {}
-        
-    def load_recent_data(self) -> pd.DataFrame:
-        """Load recent rounds data for calibration"""
+        self.latest_started_at = None
+
+    def load_recent_data(self, since_ms: float = None) -> np.ndarray:
+        """Load recent rounds data for calibration as a (N, 6) float32 array
+
+        Columns: duration_s, rug_x, players, total_wager,
+                 rug_in_5s_actual, rug_in_10s_actual
+        """
         if not os.path.exists(self.db_path):
             raise FileNotFoundError(f"Database not found at {self.db_path}")
-        
+
+        # Reruns without new rounds are common (cron); serve the full-window
+        # load from a disk cache keyed on the DB mtime when possible
+        cache_file = None
+        if since_ms is None:
+            cache_file = self._cache_path()
+            if os.path.exists(cache_file):
+                cached = np.load(cache_file)
+                rounds = cached['rounds']
+                self.latest_started_at = float(cached['latest_started_at']) \
+                    if not np.isnan(cached['latest_started_at']) else None
+                print(f"Loaded {len(rounds)} rounds for calibration (cached)")
+                return rounds
+
         conn = sqlite3.connect(self.db_path)
-        
-        # Get recent rounds with actual outcomes
+
+        # Tune the connection for a bounded read-mostly workload: WAL avoids
+        # journal rollback reads and mmap serves pages without copy-in
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+
+        # Make the ORDER BY started_at DESC LIMIT ? an index range scan
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_rounds_started
+            ON rounds(started_at DESC)
+            WHERE ended_at IS NOT NULL AND rug_time_s IS NOT NULL
+        """)
+
+        # Push the arithmetic into SQL so we only ship the columns we need
         query = """
-        SELECT r.id, r.started_at, r.ended_at, r.rug_time_s, r.rug_x,
-               r.players, r.total_wager,
-               CASE 
-                   WHEN r.rug_time_s <= 5 THEN 1 
-                   ELSE 0 
-               END as rug_in_5s_actual,
-               CASE 
-                   WHEN r.rug_time_s <= 10 THEN 1 
-                   ELSE 0 
-               END as rug_in_10s_actual
+        SELECT (r.ended_at - r.started_at) / 1000.0 as duration_s,
+               r.rug_x, r.players, r.total_wager,
+               (r.rug_time_s <= 5) as rug_in_5s_actual,
+               (r.rug_time_s <= 10) as rug_in_10s_actual
         FROM rounds r
-        WHERE r.ended_at IS NOT NULL 
+        WHERE r.ended_at IS NOT NULL
           AND r.rug_time_s IS NOT NULL
-        ORDER BY r.started_at DESC
-        LIMIT ?
         """
-        
-        rounds_df = pd.read_sql_query(query, conn, params=(self.lookback_rounds,))
+        params = []
+        if since_ms is not None:
+            query += " AND r.started_at > ?"
+            params.append(since_ms)
+        query += " ORDER BY r.started_at DESC LIMIT ?"
+        params.append(self.lookback_rounds)
+
+        # Hint the driver to batch-fetch the whole window in one go
+        cur = conn.cursor()
+        cur.arraysize = self.lookback_rounds
+        cur.execute(query, params)
+        rows = cur.fetchall()
+
+        # Track the newest round seen so incremental runs can resume from it
+        self.latest_started_at = conn.execute(
+            """SELECT MAX(r.started_at) FROM rounds r
+               WHERE r.ended_at IS NOT NULL AND r.rug_time_s IS NOT NULL"""
+        ).fetchone()[0]
         conn.close()
-        
-        print(f"Loaded {len(rounds_df)} rounds for calibration")
-        return rounds_df
-    
-    def engineer_calibration_features(self, rounds_df: pd.DataFrame) -> pd.DataFrame:
-        """Engineer features for calibration"""
-        # Calculate time-based features
-        rounds_df['duration_s'] = (rounds_df['ended_at'] - rounds_df['started_at']) / 1000
-        
-        # Calculate volatility proxy (using rug_x as proxy for volatility)
-        rounds_df['volatility_proxy'] = rounds_df['rug_x'] / rounds_df['duration_s']
-        
-        # Calculate player density
-        rounds_df['player_density'] = rounds_df['players'] / (rounds_df['duration_s'] + 1e-6)
-        
-        # Calculate wager intensity
-        rounds_df['wager_intensity'] = rounds_df['total_wager'] / (rounds_df['duration_s'] + 1e-6)
-        
-        # Create mock predictions (in practice, these would come from actual model)
-        # For now, use simple heuristics based on features
-        rounds_df['p_rug_5s_pred'] = np.clip(
-            rounds_df['volatility_proxy'] * 0.1 + 
-            rounds_df['player_density'] * 0.001 + 
-            rounds_df['wager_intensity'] * 0.0001, 
-            0.01, 0.99
-        )
-        
-        rounds_df['p_rug_10s_pred'] = np.clip(
-            rounds_df['p_rug_5s_pred'] * 1.2, 0.01, 0.99
-        )
-        
-        return rounds_df
+
+        # float32 is plenty for probability-scale data and halves the bytes
+        # every downstream NumPy op has to move
+        rounds = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+        if cache_file is not None:
+            self._write_cache(cache_file, rounds)
+
+        print(f"Loaded {len(rounds)} rounds for calibration")
+        return rounds
+
+    def _cache_path(self) -> str:
+        """Cache file keyed on (db mtime, lookback window)"""
+        import hashlib
+        key = hashlib.blake2b(
+            f"{os.path.getmtime(self.db_path)}-{self.lookback_rounds}".encode()
+        ).hexdigest()[:16]
+        return os.path.join("data", f".cache_{key}.npz")
+
+    def _write_cache(self, cache_file: str, rounds: np.ndarray,
+                     keep_last: int = 4) -> None:
+        """Persist the loaded window and evict all but the newest cache files"""
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            np.savez(cache_file, rounds=rounds,
+                     latest_started_at=np.float64(
+                         self.latest_started_at if self.latest_started_at is not None else np.nan))
+
+            import glob
+            cache_files = sorted(glob.glob(os.path.join("data", ".cache_*.npz")),
+                                 key=os.path.getmtime, reverse=True)
+            for stale in cache_files[keep_last:]:
+                os.remove(stale)
+        except Exception as e:
+            print(f"Warning: could not write load cache: {e}")
+
+    def engineer_calibration_features(
+            self, rounds: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Engineer calibration features from the raw rounds array
+
+        Returns (predictions, actuals), each keyed by horizon.
+        """
+        duration_s = rounds[:, 0]
+        rug_x = rounds[:, 1]
+        players = rounds[:, 2]
+        total_wager = rounds[:, 3]
+
+        # Create mock predictions (in practice, these would come from actual model).
+        # The volatility-proxy / player-density / wager-intensity terms are fused
+        # into one preallocated buffer per horizon instead of materializing each
+        # intermediate feature array.
+        inv_duration = 1.0 / (duration_s + 1e-6)
+
+        p_rug_5s_pred = np.empty_like(duration_s)
+        np.divide(rug_x * 0.1, duration_s, out=p_rug_5s_pred)  # volatility proxy
+        np.add(p_rug_5s_pred, players * (0.001 * inv_duration), out=p_rug_5s_pred)  # player density
+        np.add(p_rug_5s_pred, total_wager * (0.0001 * inv_duration), out=p_rug_5s_pred)  # wager intensity
+        np.clip(p_rug_5s_pred, 0.01, 0.99, out=p_rug_5s_pred)
+
+        p_rug_10s_pred = p_rug_5s_pred * 1.2
+        np.clip(p_rug_10s_pred, 0.01, 0.99, out=p_rug_10s_pred)
+
+        preds = {'5s': p_rug_5s_pred, '10s': p_rug_10s_pred}
+        actuals = {'5s': rounds[:, 4], '10s': rounds[:, 5]}
+        return preds, actuals
     
-    def compute_calibration_params(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def compute_calibration_params(self, preds: Dict[str, np.ndarray],
+                                   actuals: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Compute calibration parameters using Platt scaling"""
         calibration_results = {}
-        
+
         for horizon in ['5s', '10s']:
-            pred_col = f'p_rug_{horizon}_pred'
-            actual_col = f'rug_in_{horizon}_actual'
-            
-            if pred_col not in data.columns or actual_col not in data.columns:
-                print(f"Missing columns for {horizon} calibration")
+            if horizon not in preds or horizon not in actuals:
+                print(f"Missing arrays for {horizon} calibration")
                 continue
-            
+
             # Prepare data
-            X = data[pred_col].values.reshape(-1, 1)
-            y = data[actual_col].values
+            x = preds[horizon]
+            y = actuals[horizon]
             
-            if len(np.unique(y)) < 2:
+            # Single-class check via one reduction instead of a unique/sort
+            n_pos = int(y.sum())
+            if n_pos == 0 or n_pos == y.size:
                 print(f"Insufficient class diversity for {horizon} calibration")
                 continue
             
             try:
-                # Fit logistic regression for Platt scaling
-                lr = LogisticRegression(random_state=42)
-                lr.fit(X, y)
-                
-                # Extract parameters
-                a = lr.coef_[0][0]
-                b = lr.intercept_[0]
-                
-                # Apply calibration
-                calibrated_probs = 1 / (1 + np.exp(-(a * X.flatten() + b)))
-                
+                # Fit Platt scaling parameters directly
+                a, b = self._fit_platt(x, y)
+
+                # Apply calibration (expit is a single overflow-safe ufunc)
+                calibrated_probs = expit(a * x + b)
+
                 # Calculate calibration metrics
                 calibration_error = self._compute_calibration_error(
-                    data[pred_col], calibrated_probs, y
+                    x, calibrated_probs, y
                 )
-                
+
                 calibration_results[horizon] = {
                     'a': float(a),
                     'b': float(b),
                     'calibration_error': float(calibration_error),
-                    'original_probs': data[pred_col].tolist(),
-                    'calibrated_probs': calibrated_probs.tolist(),
-                    'actual_outcomes': y.tolist()
+                    'original_probs': x,
+                    'calibrated_probs': calibrated_probs,
+                    'actual_outcomes': y
                 }
-                
+
                 print(f"Calibration for {horizon}: a={a:.4f}, b={b:.4f}, error={calibration_error:.4f}")
                 
             except Exception as e:
@@ -139,66 +248,217 @@ class ModelCalibrator:
                 continue
         
         return calibration_results
-    
-    def _compute_calibration_error(self, pred_probs: pd.Series, 
-                                 calibrated_probs: np.ndarray, 
+
+    def load_previous_calibration(self) -> Dict[str, Any]:
+        """Load the previous calibration state, if any"""
+        calibration_file = "data/calibration.json"
+        if not os.path.exists(calibration_file):
+            return None
+
+        try:
+            with open(calibration_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading previous calibration: {e}")
+            return None
+
+    def update_calibration_incremental(self, prior: Dict[str, Any],
+                                       preds: Dict[str, np.ndarray],
+                                       actuals: Dict[str, np.ndarray],
+                                       eta: float = 0.05) -> Dict[str, Any]:
+        """Update (a, b) from new rounds only via online gradient steps
+
+        Instead of refitting Platt from scratch on the full lookback window,
+        each new (x, y) pair applies one logistic-loss gradient step to the
+        previous parameters - O(new rounds) instead of O(lookback).
+        """
+        calibration_results = {}
+
+        for horizon in ['5s', '10s']:
+            prior_params = prior.get('parameters', {}).get(horizon)
+            if prior_params is None:
+                continue
+
+            x = preds[horizon]
+            y = actuals[horizon]
+
+            a = float(prior_params['a'])
+            b = float(prior_params['b'])
+
+            for i in range(x.size):
+                p = 1.0 / (1.0 + np.exp(-(a * x[i] + b)))
+                g = p - y[i]
+                a -= eta * g * x[i]
+                b -= eta * g
+
+            calibrated_probs = expit(a * x + b)
+            calibration_error = self._compute_calibration_error(x, calibrated_probs, y)
+
+            calibration_results[horizon] = {
+                'a': float(a),
+                'b': float(b),
+                'calibration_error': float(calibration_error),
+                'original_probs': x,
+                'calibrated_probs': calibrated_probs,
+                'actual_outcomes': y
+            }
+
+            print(f"Incremental calibration for {horizon}: a={a:.4f}, b={b:.4f}, "
+                  f"error={calibration_error:.4f} ({x.size} new rounds)")
+
+        return calibration_results
+
+    def _fit_platt(self, x: np.ndarray, y: np.ndarray,
+                   max_iter: int = 20, tol: float = 1e-4) -> Tuple[float, float]:
+        """Fit Platt scaling (a, b) via Newton-Raphson on the 2-parameter logistic
+
+        Solves the same problem as LogisticRegression on a 1-D feature but
+        without the sklearn call overhead: the 2x2 Hessian is solved directly.
+        Targets are smoothed per Platt's original paper to avoid saturation.
+        """
+        n_pos = float(y.sum())
+        n_neg = float(y.size - n_pos)
+
+        # Platt target smoothing
+        t = np.where(y > 0, (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0))
+
+        # Collapse duplicate x values (the clipped heuristic stacks many
+        # samples at 0.01/0.99) so each Newton pass is O(unique), not O(N)
+        xu, inv = np.unique(x, return_inverse=True)
+        cnt = np.bincount(inv).astype(np.float64)
+        tsum = np.bincount(inv, weights=t)
+
+        if HAS_NUMBA:
+            a, b = _platt_newton(np.ascontiguousarray(xu, dtype=np.float64),
+                                 tsum, cnt, max_iter, tol)
+            return float(a), float(b)
+
+        a, b = 0.0, 0.0
+        damping = 1e-8
+
+        for _ in range(max_iter):
+            p = expit(a * xu + b)
+            d = cnt * p - tsum
+            w = cnt * p * (1.0 - p)
+
+            grad = np.array([np.sum(d * xu), np.sum(d)])
+            hess = np.array([
+                [np.sum(w * xu * xu) + damping, np.sum(w * xu)],
+                [np.sum(w * xu), np.sum(w) + damping]
+            ])
+
+            step = np.linalg.solve(hess, grad)
+            a -= step[0]
+            b -= step[1]
+
+            if np.abs(step).max() < tol:
+                break
+
+        return float(a), float(b)
+
+    def _compute_calibration_error(self, pred_probs: np.ndarray,
+                                 calibrated_probs: np.ndarray,
                                  actual: np.ndarray) -> float:
         """Compute calibration error using reliability diagram"""
-        # Bin probabilities
+        # Bin probabilities: edges are uniform on [0, 1], so the bin index is
+        # just floor(p * n_bins) - no binary search needed
         n_bins = 10
-        bin_edges = np.linspace(0, 1, n_bins + 1)
-        bin_indices = np.digitize(calibrated_probs, bin_edges) - 1
-        
-        # Calculate mean predicted vs actual for each bin
-        mean_pred = []
-        mean_actual = []
-        
-        for i in range(n_bins):
-            mask = bin_indices == i
-            if np.sum(mask) > 0:
-                mean_pred.append(np.mean(calibrated_probs[mask]))
-                mean_actual.append(np.mean(actual[mask]))
-        
-        if len(mean_pred) < 2:
+        bin_indices = np.minimum((calibrated_probs * n_bins).astype(np.int32), n_bins - 1)
+
+        # Per-bin sums in a single pass instead of masking per bin
+        bin_counts = np.bincount(bin_indices, minlength=n_bins)[:n_bins]
+        pred_sums = np.bincount(bin_indices, weights=calibrated_probs, minlength=n_bins)[:n_bins]
+        actual_sums = np.bincount(bin_indices, weights=actual, minlength=n_bins)[:n_bins]
+
+        occupied = bin_counts > 0
+        if occupied.sum() < 2:
             return 1.0  # Maximum error if insufficient bins
-        
+
+        mean_pred = pred_sums[occupied] / bin_counts[occupied]
+        mean_actual = actual_sums[occupied] / bin_counts[occupied]
+
         # Calculate mean squared error
-        mse = np.mean((np.array(mean_pred) - np.array(mean_actual)) ** 2)
+        mse = np.mean((mean_pred - mean_actual) ** 2)
         return np.sqrt(mse)
     
     def save_calibration_params(self, params: Dict[str, Any]) -> None:
-        """Save calibration parameters to file"""
+        """Save scalar parameters to JSON and the per-round arrays to NPZ"""
         calibration_file = "data/calibration.json"
+        arrays_file = "data/calibration_arrays.npz"
         os.makedirs(os.path.dirname(calibration_file), exist_ok=True)
-        
+
+        # The full probability/outcome arrays are only needed for plotting,
+        # so keep them in binary form and out of the JSON payload
+        scalar_params = {}
+        arrays = {}
+        for horizon, horizon_params in params.items():
+            scalar_params[horizon] = {
+                'a': horizon_params['a'],
+                'b': horizon_params['b'],
+                'calibration_error': horizon_params['calibration_error']
+            }
+            arrays[f'p{horizon}_orig'] = np.asarray(horizon_params['original_probs'])
+            arrays[f'p{horizon}_cal'] = np.asarray(horizon_params['calibrated_probs'])
+            arrays[f'y{horizon}'] = np.asarray(horizon_params['actual_outcomes'])
+
+        np.savez_compressed(arrays_file, **arrays)
+
         calibration_data = {
             'calibration_timestamp': datetime.now().isoformat(),
+            'latest_started_at': self.latest_started_at,
             'lookback_rounds': self.lookback_rounds,
-            'parameters': params,
+            'parameters': scalar_params,
+            'arrays_file': arrays_file,
             'description': 'Platt scaling parameters for model probability calibration'
         }
-        
-        with open(calibration_file, 'w') as f:
-            json.dump(calibration_data, f, indent=2)
-        
+
+        if orjson is not None:
+            with open(calibration_file, 'wb') as f:
+                f.write(orjson.dumps(calibration_data,
+                                     option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(calibration_file, 'w') as f:
+                json.dump(calibration_data, f, indent=2)
+
         print(f"Saved calibration parameters to {calibration_file}")
+        print(f"Saved calibration arrays to {arrays_file}")
     
-    def create_calibration_plots(self, params: Dict[str, Any]) -> None:
-        """Create calibration plots"""
+    def create_calibration_plots(self, params: Dict[str, Any],
+                                 arrays_file: str = "data/calibration_arrays.npz") -> None:
+        """Create calibration plots from the persisted NPZ arrays"""
+        if not os.path.exists(arrays_file):
+            print(f"Calibration arrays not found at {arrays_file}, skipping plots")
+            return
+
+        # matplotlib is only needed here, so keep it off the import-time path
+        import matplotlib
+        matplotlib.use('Agg')  # Use non-interactive backend
+        import matplotlib.pyplot as plt
+
         try:
-            for horizon, horizon_params in params.items():
-                if 'original_probs' not in horizon_params:
-                    continue
-                
-                # Create reliability diagram
-                fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-                
+            arrays = np.load(arrays_file)
+
+            horizons = [h for h in params if f'p{h}_orig' in arrays]
+            if not horizons:
+                return
+
+            # One shared figure/canvas for all horizons (one row each) instead
+            # of rebuilding Figure + Agg canvas per horizon
+            plt.rcParams['path.simplify_threshold'] = 1.0
+            fig, axes = plt.subplots(len(horizons), 2,
+                                     figsize=(15, 6 * len(horizons)),
+                                     squeeze=False)
+
+            for row, horizon in enumerate(horizons):
+                ax1, ax2 = axes[row]
+
                 # Plot 1: Original vs Calibrated probabilities
-                original_probs = horizon_params['original_probs']
-                calibrated_probs = horizon_params['calibrated_probs']
-                actual = horizon_params['actual_outcomes']
-                
-                ax1.scatter(original_probs, calibrated_probs, alpha=0.6, s=20)
+                original_probs = arrays[f'p{horizon}_orig']
+                calibrated_probs = arrays[f'p{horizon}_cal']
+                actual = arrays[f'y{horizon}']
+
+                ax1.scatter(original_probs, calibrated_probs, alpha=0.6, s=20,
+                            rasterized=True)
                 ax1.plot([0, 1], [0, 1], 'r--', label='Perfect Calibration')
                 ax1.set_xlabel('Original Predicted Probability')
                 ax1.set_ylabel('Calibrated Probability')
@@ -206,10 +466,9 @@ class ModelCalibrator:
                 ax1.legend()
                 ax1.grid(True, alpha=0.3)
                 
-                # Plot 2: Reliability diagram
+                # Plot 2: Reliability diagram (uniform bins, direct index)
                 n_bins = 10
-                bin_edges = np.linspace(0, 1, n_bins + 1)
-                bin_indices = np.digitize(calibrated_probs, bin_edges) - 1
+                bin_indices = np.minimum((calibrated_probs * n_bins).astype(np.int32), n_bins - 1)
                 
                 bin_centers = []
                 bin_actuals = []
@@ -231,51 +490,68 @@ class ModelCalibrator:
                     ax2.set_title(f'Reliability Diagram ({horizon})')
                     ax2.legend()
                     ax2.grid(True, alpha=0.3)
-                
-                plt.tight_layout()
-                
-                # Save plot
-                plot_file = f"data/calibration_{horizon}.png"
-                plt.savefig(plot_file, dpi=150, bbox_inches='tight')
-                plt.close()
-                
-                print(f"Saved calibration plot to {plot_file}")
-                
+
+            fig.tight_layout()
+
+            # Save one combined plot with a single canvas render
+            plot_file = "data/calibration.png"
+            fig.savefig(plot_file, dpi=150, bbox_inches='tight')
+            plt.close(fig)
+
+            print(f"Saved calibration plots to {plot_file}")
+
         except Exception as e:
             print(f"Error creating calibration plots: {e}")
     
-    def run_calibration(self) -> None:
+    def run_calibration(self, incremental: bool = False) -> None:
         """Run the complete calibration process"""
         print("🎯 Starting Model Calibration")
         print("=" * 40)
-        
+
         try:
+            prior = self.load_previous_calibration() if incremental else None
+            since_ms = prior.get('latest_started_at') if prior else None
+
             # Load data
             print("Loading recent data...")
-            rounds_df = self.load_recent_data()
-            
-            if len(rounds_df) < 50:
-                print(f"Warning: Only {len(rounds_df)} rounds available. Consider waiting for more data.")
-            
-            # Engineer features
-            print("Engineering calibration features...")
-            features_df = self.engineer_calibration_features(rounds_df)
-            
-            # Compute calibration parameters
-            print("Computing calibration parameters...")
-            calibration_params = self.compute_calibration_params(features_df)
-            
+            rounds = self.load_recent_data(since_ms=since_ms)
+
+            if prior is not None and since_ms is not None:
+                if len(rounds) == 0:
+                    print("No new rounds since last calibration, nothing to do")
+                    return
+
+                # Engineer features
+                print("Engineering calibration features...")
+                preds, actuals = self.engineer_calibration_features(rounds)
+
+                # Update prior parameters from the new rounds only
+                print("Updating calibration parameters incrementally...")
+                calibration_params = self.update_calibration_incremental(prior, preds, actuals)
+            else:
+                if len(rounds) < 50:
+                    print(f"Warning: Only {len(rounds)} rounds available. Consider waiting for more data.")
+
+                # Engineer features
+                print("Engineering calibration features...")
+                preds, actuals = self.engineer_calibration_features(rounds)
+
+                # Compute calibration parameters
+                print("Computing calibration parameters...")
+                calibration_params = self.compute_calibration_params(preds, actuals)
+
             if not calibration_params:
                 print("No calibration parameters computed")
                 return
-            
+
             # Save parameters
             print("Saving calibration parameters...")
             self.save_calibration_params(calibration_params)
-            
-            # Create plots
-            print("Creating calibration plots...")
-            self.create_calibration_plots(calibration_params)
+
+            # Create plots (skipped on incremental updates)
+            if prior is None:
+                print("Creating calibration plots...")
+                self.create_calibration_plots(calibration_params)
             
             # Print summary
             print("\n" + "="*50)
@@ -301,13 +577,20 @@ class ModelCalibrator:
 
 def main():
     """Main execution function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Calibrate model probabilities')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Update previous parameters from new rounds only')
+    args = parser.parse_args()
+
     print("🎯 Model Calibration for Rugs Research")
     print("=" * 50)
-    
+
     try:
         calibrator = ModelCalibrator()
-        calibrator.run_calibration()
-        
+        calibrator.run_calibration(incremental=args.incremental)
+
     except Exception as e:
         print(f"\n❌ Calibration failed: {e}")
         return 1
@@ -7,14 +7,15 @@ Live operations view with real-time data visualization
 import streamlit as st
 import pandas as pd
 import sqlite3
+import io
 import json
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import Optional, Dict, Any
-import time
+from typing import Optional, Dict, Any, Tuple
 
 # Page configuration
 st.set_page_config(
@@ -55,6 +56,215 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Cached data loaders. The dashboard reruns every couple of seconds, so each
+# loader is memoized with the source file's mtime as part of the cache key:
+# unchanged data is served from memory instead of re-querying SQLite or
+# re-parsing JSON on every rerun.
+
+@st.cache_resource(show_spinner=False)
+def _conn(db_path: str) -> sqlite3.Connection:
+    """One tuned read connection per session, shared by all loaders
+
+    WAL lets dashboard reads run concurrently with collector writes, the
+    busy timeout rides out checkpoint stalls, and reusing the connection
+    keeps the SQLite page cache warm between reruns.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=30000;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-65536;
+        PRAGMA temp_store=MEMORY;
+    """)
+    # Indexes for the dashboard's hot queries: the LIMIT-ordered recent
+    # rounds scan and the filtered distribution aggregates
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_rounds_ended_at
+            ON rounds(ended_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_rounds_rug_time
+            ON rounds(rug_time_s) WHERE rug_time_s > 0;
+        CREATE INDEX IF NOT EXISTS idx_rounds_rug_x
+            ON rounds(rug_x) WHERE rug_x > 0;
+    """)
+    return conn
+
+@st.cache_resource(show_spinner=False)
+def _http() -> requests.Session:
+    """Pooled keep-alive session for calls to the FastAPI backend
+
+    Bare requests.get/post opens and closes a TCP connection per call;
+    a shared Session reuses sockets across the 2s polling cadence.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount('http://', adapter)
+    return session
+
+@st.cache_data(ttl=2.0, show_spinner=False)
+def _db_stats(db_path: str, mtime: float) -> Dict[str, Any]:
+    """Table counts and latest round, cached per DB mtime"""
+    conn = _conn(db_path)
+
+    # One statement, one snapshot, one fetch instead of four round-trips
+    rounds_count, ticks_count, events_count, latest_round = conn.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM rounds),
+            (SELECT COUNT(*) FROM ticks),
+            (SELECT COUNT(*) FROM events),
+            (SELECT MAX(ended_at) FROM rounds WHERE ended_at IS NOT NULL)
+    """).fetchone()
+
+    # Get database size
+    db_size = os.path.getsize(db_path) / (1024 * 1024)  # MB
+
+    return {
+        "rounds": rounds_count,
+        "ticks": ticks_count,
+        "events": events_count,
+        "latest_round": latest_round,
+        "db_size_mb": round(db_size, 2)
+    }
+
+@st.cache_data(ttl=2.0, show_spinner=False)
+def _recent_rounds(db_path: str, mtime: float, limit: int) -> pd.DataFrame:
+    """Recent completed rounds, cached per DB mtime"""
+    conn = _conn(db_path)
+
+    # Derived columns are computed in SQL (timestamps are ms epochs) so
+    # pandas only has to convert started_at/ended_at for display
+    query = """
+    SELECT
+        id,
+        started_at,
+        ended_at,
+        max_x,
+        rug_x,
+        rug_time_s,
+        players,
+        total_wager,
+        status,
+        (ended_at - started_at) / 1000.0 AS duration,
+        ROUND(rug_time_s * 100.0 / ((ended_at - started_at) / 1000.0), 1) AS rug_time_pct
+    FROM rounds
+    WHERE ended_at IS NOT NULL
+    ORDER BY ended_at DESC
+    LIMIT ?
+    """
+
+    # Tiny LIMIT query: fetch the tuples directly and construct the frame
+    # with known columns and dtypes, skipping pandas' per-column inference
+    rows = conn.execute(query, (limit,)).fetchall()
+    df = pd.DataFrame.from_records(rows, columns=[
+        'id', 'started_at', 'ended_at', 'max_x', 'rug_x', 'rug_time_s',
+        'players', 'total_wager', 'status', 'duration', 'rug_time_pct'
+    ])
+
+    if not df.empty:
+        # Halve the frame's memory: float32/int32 comfortably hold these
+        # ranges and status is a low-cardinality string. players is
+        # nullable in the collector schema, so it needs the nullable Int32.
+        df = df.astype({
+            'id': 'int32',
+            'max_x': 'float32',
+            'rug_x': 'float32',
+            'rug_time_s': 'float32',
+            'players': 'Int32',
+            'duration': 'float32',
+            'rug_time_pct': 'float32',
+            'status': 'category'
+        })
+        # Convert timestamps for display only
+        df['started_at'] = pd.to_datetime(df['started_at'], unit='ms')
+        df['ended_at'] = pd.to_datetime(df['ended_at'], unit='ms')
+
+    return df
+
+@st.cache_data(ttl=2.0, show_spinner=False)
+def _recent_rounds_summary(db_path: str, mtime: float, limit: int) -> Dict[str, float]:
+    """Aggregate metrics over the recent-rounds window, computed in SQL"""
+    conn = _conn(db_path)
+
+    row = conn.execute("""
+        SELECT COUNT(*),
+               AVG((ended_at - started_at) / 1000.0),
+               AVG(max_x),
+               AVG(rug_x),
+               AVG(rug_time_s),
+               AVG(players),
+               AVG(total_wager),
+               AVG(CASE WHEN status = 'completed' THEN 1.0 ELSE 0.0 END)
+        FROM (
+            SELECT * FROM rounds
+            WHERE ended_at IS NOT NULL
+            ORDER BY ended_at DESC
+            LIMIT ?
+        )
+    """, (limit,)).fetchone()
+
+    keys = ('count', 'duration', 'max_x', 'rug_x', 'rug_time_s',
+            'players', 'total_wager', 'success_rate')
+    # AVG over an all-NULL column (nullable players, rug_x on non-rugged
+    # rounds) yields None; coalesce to NaN so the metrics format like the
+    # old pandas .mean() did instead of crashing the panel
+    return dict(zip(keys, (float('nan') if v is None else v for v in row)))
+
+@st.cache_data(ttl=2.0, show_spinner=False)
+def _distributions(db_path: str, mtime: float) -> Dict[str, pd.DataFrame]:
+    """Histogram buckets for the distribution panels, cached per DB mtime
+
+    Binning happens in SQL with a fixed-width GROUP BY, so each query
+    returns O(bins) rows instead of shipping every round's value into
+    pandas just to be binned there.
+    """
+    conn = _conn(db_path)
+
+    # One statement for all three metrics: one prepare, one snapshot, one
+    # round-trip instead of three separate queries per refresh
+    query = """
+    SELECT 'rug_time' AS metric,
+           CAST(rug_time_s / 5.0 AS INT) * 5.0 AS bucket,
+           COUNT(*) AS count
+    FROM rounds
+    WHERE rug_time_s IS NOT NULL AND rug_time_s > 0
+    GROUP BY bucket
+    UNION ALL
+    SELECT 'rug_x',
+           CAST(rug_x / 0.5 AS INT) * 0.5,
+           COUNT(*)
+    FROM rounds
+    WHERE rug_x IS NOT NULL AND rug_x > 0
+    GROUP BY 2
+    UNION ALL
+    SELECT 'players',
+           CAST(players / 5 AS INT) * 5,
+           COUNT(*)
+    FROM rounds
+    WHERE players IS NOT NULL AND players > 0
+    GROUP BY 2
+    ORDER BY 1, 2
+    """
+    df = pd.read_sql_query(query, conn).astype(
+        {'bucket': 'float32', 'count': 'int32'})
+
+    empty = df.iloc[0:0][['bucket', 'count']]
+    groups = {metric: group[['bucket', 'count']].reset_index(drop=True)
+              for metric, group in df.groupby('metric')}
+
+    return {key: groups.get(key, empty) for key in ('rug_time', 'rug_x', 'players')}
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _load_json(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a small JSON status file, cached per file mtime
+
+    The mtime is part of the cache key, so an unchanged file is never
+    re-opened or re-parsed; a rewrite bumps the mtime and misses the cache
+    exactly once.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
 class DashboardData:
     def __init__(self):
         self.db_path = "../data/rugs.sqlite"
@@ -62,52 +272,23 @@ class DashboardData:
         self.bankroll_path = "../data/bankroll.json"
         self.sim_results_path = "../data/sim_results.json"
         self.api_url = "http://localhost:8000"
-        
+
     def get_db_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
             if not os.path.exists(self.db_path):
                 return {"error": "Database not found"}
-                
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get table counts
-            cursor.execute("SELECT COUNT(*) FROM rounds")
-            rounds_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM ticks")
-            ticks_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM events")
-            events_count = cursor.fetchone()[0]
-            
-            # Get latest round
-            cursor.execute("SELECT MAX(ended_at) FROM rounds WHERE ended_at IS NOT NULL")
-            latest_round = cursor.fetchone()[0]
-            
-            # Get database size
-            db_size = os.path.getsize(self.db_path) / (1024 * 1024)  # MB
-            
-            conn.close()
-            
-            return {
-                "rounds": rounds_count,
-                "ticks": ticks_count,
-                "events": events_count,
-                "latest_round": latest_round,
-                "db_size_mb": round(db_size, 2)
-            }
+
+            return _db_stats(self.db_path, os.path.getmtime(self.db_path))
         except Exception as e:
             return {"error": str(e)}
-    
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get current model information"""
         try:
             if os.path.exists(self.model_path):
-                with open(self.model_path, 'r') as f:
-                    model_data = json.load(f)
-                
+                model_data = _load_json(self.model_path, os.path.getmtime(self.model_path))
+
                 return {
                     "loaded": True,
                     "version": os.path.basename(self.model_path),
@@ -122,7 +303,7 @@ class DashboardData:
     def get_api_health(self) -> Dict[str, Any]:
         """Check API health"""
         try:
-            response = requests.get(f"{self.api_url}/health", timeout=5)
+            response = _http().get(f"{self.api_url}/health", timeout=5)
             if response.status_code == 200:
                 return {"online": True, "data": response.json()}
             else:
@@ -135,92 +316,42 @@ class DashboardData:
         try:
             if not os.path.exists(self.db_path):
                 return pd.DataFrame()
-                
-            conn = sqlite3.connect(self.db_path)
-            
-            query = """
-            SELECT 
-                id,
-                started_at,
-                ended_at,
-                max_x,
-                rug_x,
-                rug_time_s,
-                players,
-                total_wager,
-                status
-            FROM rounds 
-            WHERE ended_at IS NOT NULL 
-            ORDER BY ended_at DESC 
-            LIMIT ?
-            """
-            
-            df = pd.read_sql_query(query, conn, params=(limit,))
-            conn.close()
-            
-            if not df.empty:
-                # Convert timestamps
-                df['started_at'] = pd.to_datetime(df['started_at'])
-                df['ended_at'] = pd.to_datetime(df['ended_at'])
-                df['duration'] = (df['ended_at'] - df['started_at']).dt.total_seconds()
-                
-                # Calculate some metrics
-                df['rug_time_pct'] = (df['rug_time_s'] / df['duration'] * 100).round(1)
-                
-            return df
-            
+
+            return _recent_rounds(self.db_path, os.path.getmtime(self.db_path), limit)
+
         except Exception as e:
             st.error(f"Error loading recent rounds: {e}")
             return pd.DataFrame()
-    
+
+    def get_recent_rounds_summary(self, limit: int = 5) -> Dict[str, float]:
+        """Get aggregate metrics over the recent rounds window"""
+        try:
+            if not os.path.exists(self.db_path):
+                return {}
+
+            return _recent_rounds_summary(self.db_path, os.path.getmtime(self.db_path), limit)
+        except Exception as e:
+            st.error(f"Error loading rounds summary: {e}")
+            return {}
+
     def get_distributions(self) -> Dict[str, Any]:
         """Get distribution data for visualizations"""
         try:
             if not os.path.exists(self.db_path):
                 return {}
-                
-            conn = sqlite3.connect(self.db_path)
-            
-            # Rug time distribution
-            rug_time_query = """
-            SELECT rug_time_s FROM rounds 
-            WHERE rug_time_s IS NOT NULL AND rug_time_s > 0
-            """
-            rug_time_df = pd.read_sql_query(rug_time_query, conn)
-            
-            # Rug multiplier distribution
-            rug_x_query = """
-            SELECT rug_x FROM rounds 
-            WHERE rug_x IS NOT NULL AND rug_x > 0
-            """
-            rug_x_df = pd.read_sql_query(rug_x_query, conn)
-            
-            # Player count distribution
-            players_query = """
-            SELECT players FROM rounds 
-            WHERE players IS NOT NULL AND players > 0
-            """
-            players_df = pd.read_sql_query(players_query, conn)
-            
-            conn.close()
-            
-            return {
-                "rug_time": rug_time_df,
-                "rug_x": rug_x_df,
-                "players": players_df
-            }
-            
+
+            return _distributions(self.db_path, os.path.getmtime(self.db_path))
+
         except Exception as e:
             st.error(f"Error loading distributions: {e}")
             return {}
-    
+
     def get_bankroll_status(self) -> Dict[str, Any]:
         """Get bankroll status"""
         try:
             if os.path.exists(self.bankroll_path):
-                with open(self.bankroll_path, 'r') as f:
-                    bankroll_data = json.load(f)
-                
+                bankroll_data = _load_json(self.bankroll_path, os.path.getmtime(self.bankroll_path))
+
                 return {
                     "loaded": True,
                     "balance": bankroll_data.get('balance', 0),
@@ -238,9 +369,8 @@ class DashboardData:
         """Get strategy simulation results"""
         try:
             if os.path.exists(self.sim_results_path):
-                with open(self.sim_results_path, 'r') as f:
-                    sim_data = json.load(f)
-                
+                sim_data = _load_json(self.sim_results_path, os.path.getmtime(self.sim_results_path))
+
                 return {
                     "loaded": True,
                     "data": sim_data
@@ -256,145 +386,157 @@ class DashboardData:
             thresholds_path = "../data/thresholds.json"
             if not os.path.exists(thresholds_path):
                 return None
-            
-            with open(thresholds_path, 'r') as f:
-                thresholds = json.load(f)
-            
-            return thresholds
+
+            return _load_json(thresholds_path, os.path.getmtime(thresholds_path))
         except Exception as e:
             print(f"Error loading thresholds: {e}")
             return None
 
-def create_histogram(data: pd.Series, title: str, xlabel: str, bins: int = 20):
-    """Create a histogram plot"""
-    if data.empty:
+@st.cache_data(show_spinner=False)
+def _hist_frame(buckets: pd.DataFrame, xlabel: str) -> Tuple[pd.DataFrame, float]:
+    """Chart-ready bucket frame plus approximate mean, cached on contents
+
+    Keyed on the bucket values themselves, so the rename and the weighted
+    mean only recompute when new rounds actually change the histogram.
+    """
+    # Work on the columns' own buffers: to_numpy(copy=False) hands back the
+    # underlying float32/int32 arrays without a Series temporary each
+    bucket_arr = buckets['bucket'].to_numpy(copy=False)
+    count_arr = buckets['count'].to_numpy(copy=False)
+    mean_val = float(np.dot(bucket_arr, count_arr) / count_arr.sum())
+
+    frame = buckets.rename(columns={'bucket': xlabel, 'count': 'Frequency'})
+    return frame, mean_val
+
+def create_histogram(buckets: pd.DataFrame, title: str, xlabel: str):
+    """Render pre-aggregated histogram buckets as a native bar chart
+
+    st.bar_chart ships the binned counts as data and lets the browser draw
+    them, instead of rasterizing a matplotlib figure server-side on every
+    rerun. Binning itself already happened in SQL.
+    """
+    if buckets.empty:
         st.warning(f"No data available for {title}")
         return
-    
-    fig, ax = plt.subplots(figsize=(8, 4))
-    ax.hist(data, bins=bins, alpha=0.7, color='#4ecdc4', edgecolor='black')
-    ax.set_title(title)
-    ax.set_xlabel(xlabel)
-    ax.set_ylabel('Frequency')
-    ax.grid(True, alpha=0.3)
-    
-    # Add statistics
-    mean_val = data.mean()
-    median_val = data.median()
-    ax.axvline(mean_val, color='red', linestyle='--', label=f'Mean: {mean_val:.2f}')
-    ax.axvline(median_val, color='orange', linestyle='--', label=f'Median: {median_val:.2f}')
-    ax.legend()
-    
-    st.pyplot(fig)
-    plt.close()
+
+    frame, mean_val = _hist_frame(buckets, xlabel)
+
+    st.markdown(f"**{title}**")
+    st.caption(f"Mean: ~{mean_val:.2f}")
+    st.bar_chart(frame, x=xlabel, y='Frequency')
 
 def create_equity_curves(sim_data: Dict[str, Any]):
-    """Create equity curves plot"""
+    """Render equity curves as a native line chart"""
     if not sim_data.get('loaded'):
         st.warning("No simulation data available")
         return
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
+
+    frames = []
     for strategy_name, strategy_data in sim_data['data'].items():
-        if 'equity_curve' in strategy_data:
-            equity_curve = strategy_data['equity_curve']
-            if len(equity_curve) > 1:
-                x = range(len(equity_curve))
-                ax.plot(x, equity_curve, label=strategy_name, linewidth=2)
-    
-    ax.set_title('Strategy Equity Curves')
-    ax.set_xlabel('Trade Number')
-    ax.set_ylabel('Portfolio Value ($)')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-    
-    st.pyplot(fig)
-    plt.close()
+        equity_curve = strategy_data.get('equity_curve', [])
+        if len(equity_curve) > 1:
+            frames.append(pd.DataFrame({
+                'trade': np.arange(len(equity_curve)),
+                'strategy': strategy_name,
+                'equity': equity_curve
+            }))
+
+    if not frames:
+        st.warning("No simulation data available")
+        return
+
+    st.markdown("**Strategy Equity Curves**")
+    st.line_chart(pd.concat(frames, ignore_index=True),
+                  x='trade', y='equity', color='strategy')
+
+@st.cache_data(show_spinner=False)
+def _ev_surface_png() -> bytes:
+    """Render the EV surface to PNG bytes once; its inputs are constants
+
+    Caching the encoded bytes rather than the Figure means reruns skip
+    matplotlib serialization entirely and just ship the same image.
+    """
+    # Create sample data for EV surface
+    x_range = np.linspace(1.0, 5.0, 50)
+    p5_range = np.linspace(0.0, 0.6, 50)
+    X, Y = np.meshgrid(x_range, p5_range)
+
+    # Calculate EV difference (cash_now - hold) in one broadcast:
+    # cash now after slippage minus the simplified hold EV.
+    # This is a simplified example - in practice, use actual EV calculations
+    Z = X * 0.998 - ((1 - Y) * X * 1.15 + Y * 1.02)
+
+    # Create the plot
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Create heatmap
+    im = ax.contourf(X, Y, Z, levels=20, cmap='RdYlGn')
+
+    # Add decision boundary (where EV difference = 0)
+    contour = ax.contour(X, Y, Z, levels=[0], colors='black', linewidths=2)
+    ax.clabel(contour, inline=True, fontsize=10, fmt='%.2f')
+
+    # Customize plot
+    ax.set_title('EV Surface: Cash Now vs Hold Decision Boundary')
+    ax.set_xlabel('Current Multiplier (x)')
+    ax.set_ylabel('Probability of Rug in 5s (p_rug_5s)')
+
+    # Add colorbar
+    cbar = plt.colorbar(im, ax=ax)
+    cbar.set_label('EV(Cash Now) - EV(Hold)')
+
+    # Add annotations
+    ax.text(0.02, 0.98, 'Green: Hold is better\nRed: Cash now is better',
+            transform=ax.transAxes, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=90, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
 
 def create_ev_surface():
     """Create EV surface plot showing decision boundaries"""
     try:
-        # Create sample data for EV surface
-        x_range = np.linspace(1.0, 5.0, 50)
-        p5_range = np.linspace(0.0, 0.6, 50)
-        X, Y = np.meshgrid(x_range, p5_range)
-        
-        # Calculate EV difference (cash_now - hold)
-        # This is a simplified example - in practice, use actual EV calculations
-        Z = np.zeros_like(X)
-        for i in range(len(p5_range)):
-            for j in range(len(x_range)):
-                x = x_range[j]
-                p5 = p5_range[i]
-                
-                # Simplified EV calculation
-                ev_cash_now = x * 0.998  # After slippage
-                ev_hold = (1 - p5) * x * 1.15 + p5 * 1.02  # Simplified hold EV
-                Z[i, j] = ev_cash_now - ev_hold
-        
-        # Create the plot
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Create heatmap
-        im = ax.contourf(X, Y, Z, levels=20, cmap='RdYlGn')
-        
-        # Add decision boundary (where EV difference = 0)
-        contour = ax.contour(X, Y, Z, levels=[0], colors='black', linewidths=2)
-        ax.clabel(contour, inline=True, fontsize=10, fmt='%.2f')
-        
-        # Customize plot
-        ax.set_title('EV Surface: Cash Now vs Hold Decision Boundary')
-        ax.set_xlabel('Current Multiplier (x)')
-        ax.set_ylabel('Probability of Rug in 5s (p_rug_5s)')
-        
-        # Add colorbar
-        cbar = plt.colorbar(im, ax=ax)
-        cbar.set_label('EV(Cash Now) - EV(Hold)')
-        
-        # Add annotations
-        ax.text(0.02, 0.98, 'Green: Hold is better\nRed: Cash now is better', 
-                transform=ax.transAxes, verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-        
-        st.pyplot(fig)
-        plt.close()
-        
+        st.image(_ev_surface_png())
     except Exception as e:
         st.error(f"Error creating EV surface: {e}")
         st.info("EV surface plot could not be generated")
 
-def main():
-    st.markdown('<h1 class="main-header">🎯 Rugs Research Dashboard</h1>', unsafe_allow_html=True)
-    
-    # Initialize data
-    data = DashboardData()
-    
-    # Auto-refresh every 2 seconds
-    if 'refresh_counter' not in st.session_state:
-        st.session_state.refresh_counter = 0
-    
-    st.session_state.refresh_counter += 1
-    
-    # Sidebar
-    st.sidebar.title("🔧 Dashboard Controls")
-    
-    # Auto-refresh toggle
-    auto_refresh = st.sidebar.checkbox("Auto-refresh (2s)", value=True)
-    
-    if auto_refresh:
-        st.sidebar.info("🔄 Auto-refreshing every 2 seconds")
-        time.sleep(0.1)  # Small delay to allow refresh
-        st.experimental_rerun()
-    
-    # Manual refresh button
-    if st.sidebar.button("🔄 Manual Refresh"):
-        st.experimental_rerun()
-    
-    # Main dashboard content
+# Status strings are constants; build them once instead of per rerun
+_STATUS_ONLINE = "🟢 Online"
+_STATUS_OFFLINE = "🔴 Offline"
+
+def _render_api_status(api_health: Dict[str, Any]):
+    """API status metrics, looking up latest_round exactly once
+
+    The old inline expression chained .get('database', {}).get(...) twice
+    and could slice None when latest_round disappeared between the check
+    and the display.
+    """
+    if not api_health.get('online'):
+        st.metric("Status", _STATUS_OFFLINE, delta="Disconnected")
+        st.error(f"API Error: {api_health.get('error', 'Unknown')}")
+        return
+
+    st.metric("Status", _STATUS_ONLINE, delta="Connected")
+
+    api_data = api_health.get('data')
+    if api_data:
+        st.metric("Model Loaded", "✅" if api_data.get('model_loaded') else "❌")
+        latest_round = (api_data.get('database') or {}).get('latest_round')
+        st.metric("Last Round", latest_round[:10] if isinstance(latest_round, str) else 'N/A')
+
+# Dashboard panels. Each panel is an st.fragment so it reruns on its own
+# cadence: the live panels poll every 2s while the heavyweight
+# distribution/EV/strategy sections only re-render on interaction, instead
+# of the whole page re-executing in a global rerun loop.
+
+@st.fragment(run_every=2)
+def status_panel(data: 'DashboardData'):
+    """Live status top bar: database, model, API and bankroll"""
     col1, col2, col3, col4 = st.columns(4)
-    
-    # Live Status (Top Bar)
+
     with col1:
         st.subheader("📊 Database")
         db_stats = data.get_db_stats()
@@ -420,17 +562,7 @@ def main():
     
     with col3:
         st.subheader("🌐 API")
-        api_health = data.get_api_health()
-        
-        if api_health.get('online'):
-            st.metric("Status", "🟢 Online", delta="Connected")
-            if api_health.get('data'):
-                api_data = api_health['data']
-                st.metric("Model Loaded", "✅" if api_data.get('model_loaded') else "❌")
-                st.metric("Last Round", api_data.get('database', {}).get('latest_round', 'N/A')[:10] if api_data.get('database', {}).get('latest_round') else 'N/A')
-        else:
-            st.metric("Status", "🔴 Offline", delta="Disconnected")
-            st.error(f"API Error: {api_health.get('error', 'Unknown')}")
+        _render_api_status(data.get_api_health())
     
     with col4:
         st.subheader("💰 Bankroll")
@@ -445,13 +577,16 @@ def main():
         else:
             st.metric("Status", "❌ Not Found")
             st.error(f"Bankroll Error: {bankroll_status.get('error', 'Unknown')}")
-    
-    # Now Playing Section
+
+@st.fragment(run_every=2)
+def now_playing_panel(data: 'DashboardData'):
+    """Latest round metrics plus the live prediction, on the 2s cadence"""
     st.markdown("---")
     st.subheader("🎮 Now Playing")
-    
+
     recent_rounds = data.get_recent_rounds(limit=5)
-    
+    api_health = data.get_api_health()
+
     if not recent_rounds.empty:
         # Get the most recent round
         latest_round = recent_rounds.iloc[0]
@@ -487,7 +622,7 @@ def main():
                     "wager": latest_round['total_wager']
                 }
                 
-                response = requests.post(f"{data.api_url}/predict", json=prediction_data, timeout=5)
+                response = _http().post(f"{data.api_url}/predict", json=prediction_data, timeout=5)
                 if response.status_code == 200:
                     prediction = response.json()
                     
@@ -505,84 +640,98 @@ def main():
             st.info("API offline - predictions unavailable")
     else:
         st.warning("No recent rounds data available. Start the collector to see live data.")
-    
-    # Recent Rounds Table
+
+@st.fragment(run_every=2)
+def recent_rounds_panel(data: 'DashboardData'):
+    """Recent rounds table with summary statistics"""
     st.markdown("---")
     st.subheader("📋 Recent Rounds")
-    
+
+    recent_rounds = data.get_recent_rounds(limit=5)
+
     if not recent_rounds.empty:
-        # Format the dataframe for display
-        display_df = recent_rounds.copy()
-        display_df['started_at'] = display_df['started_at'].dt.strftime('%H:%M:%S')
-        display_df['ended_at'] = display_df['ended_at'].dt.strftime('%H:%M:%S')
-        display_df['duration'] = display_df['duration'].round(1)
-        display_df['max_x'] = display_df['max_x'].round(2)
-        display_df['rug_x'] = display_df['rug_x'].round(2)
-        display_df['rug_time_s'] = display_df['rug_time_s'].round(1)
-        display_df['rug_time_pct'] = display_df['rug_time_pct'].round(1)
-        display_df['total_wager'] = display_df['total_wager'].apply(lambda x: f"${x:,.0f}")
-        
-        # Select columns to display
-        display_columns = ['id', 'started_at', 'ended_at', 'duration', 'max_x', 'rug_x', 
+        # Keep the columns numeric (sortable client-side) and let Streamlit
+        # format them in the browser instead of per-row Python transforms
+        display_columns = ['id', 'started_at', 'ended_at', 'duration', 'max_x', 'rug_x',
                           'rug_time_s', 'rug_time_pct', 'players', 'total_wager', 'status']
+
+        st.dataframe(
+            recent_rounds[display_columns],
+            use_container_width=True,
+            column_config={
+                'started_at': st.column_config.TimeColumn(format="HH:mm:ss"),
+                'ended_at': st.column_config.TimeColumn(format="HH:mm:ss"),
+                'duration': st.column_config.NumberColumn(format="%.1fs"),
+                'max_x': st.column_config.NumberColumn(format="%.2fx"),
+                'rug_x': st.column_config.NumberColumn(format="%.2fx"),
+                'rug_time_s': st.column_config.NumberColumn(format="%.1fs"),
+                'rug_time_pct': st.column_config.NumberColumn(format="%.1f%%"),
+                'total_wager': st.column_config.NumberColumn(format="$%d")
+            }
+        )
         
-        st.dataframe(display_df[display_columns], use_container_width=True)
-        
-        # Summary statistics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Avg Duration", f"{recent_rounds['duration'].mean():.1f}s")
-            st.metric("Avg Max X", f"{recent_rounds['max_x'].mean():.2f}x")
-        
-        with col2:
-            st.metric("Avg Rug X", f"{recent_rounds['rug_x'].mean():.2f}x")
-            st.metric("Avg Rug Time", f"{recent_rounds['rug_time_s'].mean():.1f}s")
-        
-        with col3:
-            st.metric("Avg Players", f"{recent_rounds['players'].mean():,.0f}")
-            st.metric("Avg Wager", f"${recent_rounds['total_wager'].mean():,.0f}")
-        
-        with col4:
-            st.metric("Total Rounds", len(recent_rounds))
-            st.metric("Success Rate", f"{(recent_rounds['status'] == 'completed').mean()*100:.1f}%")
+        # Summary statistics, aggregated by SQL in one pass
+        summary = data.get_recent_rounds_summary(limit=5)
+
+        if summary:
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.metric("Avg Duration", f"{summary['duration']:.1f}s")
+                st.metric("Avg Max X", f"{summary['max_x']:.2f}x")
+
+            with col2:
+                st.metric("Avg Rug X", f"{summary['rug_x']:.2f}x")
+                st.metric("Avg Rug Time", f"{summary['rug_time_s']:.1f}s")
+
+            with col3:
+                st.metric("Avg Players", f"{summary['players']:,.0f}")
+                st.metric("Avg Wager", f"${summary['total_wager']:,.0f}")
+
+            with col4:
+                st.metric("Total Rounds", summary['count'])
+                st.metric("Success Rate", f"{summary['success_rate']*100:.1f}%")
     else:
         st.info("No rounds data available")
-    
-    # Distributions and Curves
+
+@st.fragment(run_every=60)
+def distributions_panel(data: 'DashboardData'):
+    """Histogram panels; distributions drift slowly, so refresh per minute"""
     st.markdown("---")
     st.subheader("📊 Distributions & Curves")
-    
+
     distributions = data.get_distributions()
-    
+
     if distributions:
         col1, col2 = st.columns(2)
         
         with col1:
             if not distributions['rug_time'].empty:
-                create_histogram(distributions['rug_time']['rug_time_s'], 
-                               'Rug Time Distribution', 'Rug Time (seconds)', bins=30)
+                create_histogram(distributions['rug_time'],
+                               'Rug Time Distribution', 'Rug Time (seconds)')
             else:
                 st.info("No rug time data available")
-        
+
         with col2:
             if not distributions['rug_x'].empty:
-                create_histogram(distributions['rug_x']['rug_x'], 
-                               'Rug Multiplier Distribution', 'Rug Multiplier (x)', bins=20)
+                create_histogram(distributions['rug_x'],
+                               'Rug Multiplier Distribution', 'Rug Multiplier (x)')
             else:
                 st.info("No rug multiplier data available")
-        
+
         # Player distribution
         if not distributions['players'].empty:
-            create_histogram(distributions['players']['players'], 
-                           'Player Count Distribution', 'Number of Players', bins=25)
+            create_histogram(distributions['players'],
+                           'Player Count Distribution', 'Number of Players')
     else:
         st.info("No distribution data available")
-    
-    # Live EV & Actions Panel
+
+@st.fragment
+def ev_panel(data: 'DashboardData'):
+    """Thresholds, active regime and the EV surface"""
     st.markdown("---")
     st.subheader("🎯 Live EV & Actions")
-    
+
     # Get current thresholds and regime
     try:
         thresholds = data.get_thresholds()
@@ -618,13 +767,15 @@ def main():
         create_ev_surface()
     except Exception as e:
         st.error(f"Error creating EV surface: {e}")
-    
-    # Strategy Panel
+
+@st.fragment
+def strategy_panel(data: 'DashboardData'):
+    """Equity curves and per-strategy summary from the last simulation run"""
     st.markdown("---")
     st.subheader("📈 Strategy Performance")
-    
+
     sim_results = data.get_simulation_results()
-    
+
     if sim_results.get('loaded'):
         # Create equity curves
         create_equity_curves(sim_results)
@@ -648,11 +799,15 @@ def main():
                 st.dataframe(summary_df, use_container_width=True)
     else:
         st.info("No strategy simulation results available. Run 'make simulate' to generate results.")
-    
-    # Bankroll Panel
+
+@st.fragment
+def bankroll_panel(data: 'DashboardData'):
+    """Bankroll balance and daily loss-cap status"""
     st.markdown("---")
     st.subheader("💰 Bankroll Management")
-    
+
+    bankroll_status = data.get_bankroll_status()
+
     if bankroll_status.get('loaded'):
         col1, col2, col3 = st.columns(3)
         
@@ -675,15 +830,46 @@ def main():
                 st.success("✅ Daily loss within limits")
     else:
         st.info("No bankroll data available. Bankroll management not configured.")
-    
+
+def main():
+    st.markdown('<h1 class="main-header">🎯 Rugs Research Dashboard</h1>', unsafe_allow_html=True)
+
+    # Initialize data
+    data = DashboardData()
+
+    # Sidebar
+    st.sidebar.title("🔧 Dashboard Controls")
+
+    st.sidebar.info("🔄 Live panels refresh every 2 seconds")
+
+    # Manual refresh button
+    if st.sidebar.button("🔄 Manual Refresh"):
+        st.rerun()
+
+    # Warm the loader caches concurrently so a full-page rerun costs
+    # max(query) wall-clock instead of sum(queries); the panels below then
+    # read the same entries from cache.
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        wait([
+            executor.submit(data.get_db_stats),
+            executor.submit(data.get_recent_rounds, 5),
+            executor.submit(data.get_distributions),
+            executor.submit(data.get_api_health),
+            executor.submit(data.get_bankroll_status),
+            executor.submit(data.get_simulation_results)
+        ])
+
+    status_panel(data)
+    now_playing_panel(data)
+    recent_rounds_panel(data)
+    distributions_panel(data)
+    ev_panel(data)
+    strategy_panel(data)
+    bankroll_panel(data)
+
     # Footer
     st.markdown("---")
     st.markdown(f"*Dashboard last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-    
-    # Auto-refresh logic
-    if auto_refresh:
-        time.sleep(2)
-        st.experimental_rerun()
 
 if __name__ == "__main__":
     main()
@@ -25,45 +25,67 @@ def load_metrics(metrics_path: str = "../data/metrics.json") -> dict:
         return None
 
 def load_recent_data(db_path: str = "../data/rugs.sqlite", rounds_limit: int = 200) -> pd.DataFrame:
-    """Load recent rounds data for drift analysis"""
+    """Load recent rounds data for drift analysis
+
+    Only the round columns the drift metrics actually read are selected;
+    the tick table never contributed to the report and is no longer
+    shipped into Python at all.
+    """
     if not os.path.exists(db_path):
         print(f"❌ Database not found: {db_path}")
         return None
-    
+
     try:
         conn = sqlite3.connect(db_path)
-        
+
+        # Tune the connection for bulk analytical reads
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA temp_store=MEMORY;
+        """)
+
+        # Keep the LIMIT-ordered scan an index walk on a growing table
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rounds_ended_at ON rounds(ended_at DESC)")
+
+        # Everything past this point only reads
+        conn.execute("PRAGMA query_only=1")
+
         # Get recent rounds
-        query = f"""
-        SELECT * FROM rounds 
-        WHERE ended_at IS NOT NULL 
-        ORDER BY ended_at DESC 
-        LIMIT {rounds_limit}
+        query = """
+        SELECT started_at, ended_at, max_x, rug_x FROM rounds
+        WHERE ended_at IS NOT NULL
+        ORDER BY ended_at DESC
+        LIMIT ?
         """
-        rounds_df = pd.read_sql_query(query, conn)
-        
-        # Get ticks for these rounds
-        if len(rounds_df) > 0:
-            round_ids = rounds_df['id'].tolist()
-            placeholders = ','.join(['?' for _ in round_ids])
-            ticks_query = f"""
-            SELECT * FROM ticks 
-            WHERE round_id IN ({placeholders})
-            ORDER BY ts
-            """
-            ticks_df = pd.read_sql_query(ticks_query, conn, params=round_ids)
-        else:
-            ticks_df = pd.DataFrame()
-        
+        rounds_df = pd.read_sql_query(query, conn, params=(rounds_limit,))
+
         conn.close()
-        
-        return rounds_df, ticks_df
-        
+
+        return rounds_df
+
     except Exception as e:
         print(f"❌ Error loading recent data: {e}")
-        return None, None
+        return None
+
+def _bin_distribution(values: np.ndarray, edges: np.ndarray, labels: list) -> dict:
+    """Share of values per right-closed bin, in one searchsorted pass
+
+    Equivalent to pd.cut + value_counts(normalize=True) but works directly
+    on the raw array with no Categorical boxing.
+    """
+    idx = np.searchsorted(edges, values, side='left') - 1
+    valid = (idx >= 0) & (idx < len(labels))
+    counts = np.bincount(idx[valid], minlength=len(labels))
 
-def compute_baseline_metrics(rounds_df: pd.DataFrame, ticks_df: pd.DataFrame) -> dict:
+    total = counts.sum()
+    if total == 0:
+        return {label: 0.0 for label in labels}
+
+    return dict(zip(labels, (counts / total).tolist()))
+
+def compute_baseline_metrics(rounds_df: pd.DataFrame) -> dict:
     """Compute baseline metrics from training data"""
     if len(rounds_df) == 0:
         return None
@@ -79,31 +101,30 @@ def compute_baseline_metrics(rounds_df: pd.DataFrame, ticks_df: pd.DataFrame) ->
     }
     
     # Rug timing distribution
-    rug_rounds = rounds_df[rounds_df['rug_x'].notna()].copy()
+    rug_rounds = rounds_df[rounds_df['rug_x'].notna()]
     if len(rug_rounds) > 0:
-        rug_rounds['duration'] = (rug_rounds['ended_at'] - rug_rounds['started_at']) / 1000
-        
+        # Bin on float32: the outputs are proportions, so half the bytes
+        # through the searchsorted scan costs nothing in accuracy
+        duration = ((rug_rounds['ended_at'].to_numpy() - rug_rounds['started_at'].to_numpy())
+                    / 1000.0).astype(np.float32, copy=False)
+
         # Time-based rug distribution
-        time_bins = [0, 10, 30, 60, 120, 300, float('inf')]
+        time_edges = np.array([0, 10, 30, 60, 120, 300, np.inf])
         time_labels = ['0-10s', '10-30s', '30-60s', '1-2m', '2-5m', '5m+']
-        
-        rug_rounds['time_bin'] = pd.cut(rug_rounds['duration'], bins=time_bins, labels=time_labels)
-        time_dist = rug_rounds['time_bin'].value_counts(normalize=True).to_dict()
-        baseline['rug_timing']['time_distribution'] = time_dist
-        
+        baseline['rug_timing']['time_distribution'] = _bin_distribution(
+            duration, time_edges, time_labels)
+
         # Multiplier-based rug distribution
-        x_bins = [0, 1.5, 2, 3, 5, 10, float('inf')]
+        x_edges = np.array([0, 1.5, 2, 3, 5, 10, np.inf])
         x_labels = ['0-1.5x', '1.5-2x', '2-3x', '3-5x', '5-10x', '10x+']
-        
-        rug_rounds['x_bin'] = pd.cut(rug_rounds['rug_x'], bins=x_bins, labels=x_labels)
-        x_dist = rug_rounds['x_bin'].value_counts(normalize=True).to_dict()
-        baseline['rug_timing']['multiplier_distribution'] = x_dist
-    
+        baseline['rug_timing']['multiplier_distribution'] = _bin_distribution(
+            rug_rounds['rug_x'].to_numpy(dtype=np.float32), x_edges, x_labels)
+
     return baseline
 
-def compute_recent_metrics(rounds_df: pd.DataFrame, ticks_df: pd.DataFrame) -> dict:
+def compute_recent_metrics(rounds_df: pd.DataFrame) -> dict:
     """Compute metrics from recent data"""
-    return compute_baseline_metrics(rounds_df, ticks_df)
+    return compute_baseline_metrics(rounds_df)
 
 def compare_distributions(baseline_dist: dict, recent_dist: dict, threshold_pct: float = 20.0) -> dict:
     """Compare distributions and detect drift"""
@@ -251,24 +272,32 @@ def main():
         return 1
     
     # Load recent data
-    rounds_df, ticks_df = load_recent_data(args.db_path, args.rounds)
+    rounds_df = load_recent_data(args.db_path, args.rounds)
     if rounds_df is None:
         return 1
-    
+
     if len(rounds_df) == 0:
         print("❌ No recent rounds found for analysis")
         return 1
-    
-    # Compute metrics
-    baseline_dist = compute_baseline_metrics(rounds_df, ticks_df)
-    recent_dist = compute_recent_metrics(rounds_df, ticks_df)
-    
+
+    # Compute metrics. The baseline comes from metrics.json, persisted at
+    # training time; only the recent window is computed from the DB. Older
+    # metrics files without a stored baseline fall back to the previous
+    # behavior of deriving one from the same recent rows.
+    baseline_dist = baseline_metrics.get('baseline')
+    if baseline_dist is None:
+        baseline_dist = compute_baseline_metrics(rounds_df)
+
+    recent_dist = compute_recent_metrics(rounds_df)
+
     if baseline_dist is None or recent_dist is None:
         print("❌ Failed to compute metrics")
         return 1
-    
+
     # Compare distributions
-    drift_results = compare_distributions(baseline_dist, recent_dist, args.threshold)
+    drift_results = compare_distributions(baseline_dist.get('rug_timing', {}),
+                                          recent_dist.get('rug_timing', {}),
+                                          args.threshold)
     
     # Print report
     print_drift_report(baseline_dist, recent_dist, drift_results, args.threshold)
@@ -36,6 +36,20 @@ def load_model(model_path: str = "../data/model.json") -> dict:
         print(f"❌ Error loading model: {e}")
         return None
 
+def _curves_to_arrays(metrics: dict) -> None:
+    """Convert the per-model curve lists to NumPy arrays in place
+
+    json.load hands back plain Python lists; every report section that
+    indexes or searches them would otherwise re-convert per call. One pass
+    here and the rest of the CLI works on ndarrays.
+    """
+    for model_metrics in metrics.get('models', {}).values():
+        for curve in ('roc_curve', 'pr_curve', 'calibration_curve'):
+            data = model_metrics.get(curve)
+            if data:
+                for key, values in data.items():
+                    data[key] = np.asarray(values)
+
 def print_metrics_summary(metrics: dict):
     """Print a summary of model metrics"""
     print("\n" + "="*80)
@@ -90,8 +104,16 @@ def print_threshold_analysis(metrics: dict, threshold: float = 0.5):
         fpr = model_metrics['roc_curve']['fpr']
         tpr = model_metrics['roc_curve']['tpr']
         
-        # Find closest threshold
-        threshold_idx = np.argmin(np.abs(np.array(roc_thresholds) - threshold))
+        # Find closest threshold by bisection: sklearn emits ROC thresholds
+        # in decreasing order, so a reversed view is sorted and searchsorted
+        # replaces the O(N) argmin scan
+        ascending = roc_thresholds[::-1]
+        pos = np.searchsorted(ascending, threshold)
+        if pos == len(ascending):
+            pos -= 1
+        elif pos > 0 and threshold - ascending[pos - 1] < ascending[pos] - threshold:
+            pos -= 1
+        threshold_idx = len(roc_thresholds) - 1 - pos
         actual_threshold = roc_thresholds[threshold_idx]
         actual_fpr = fpr[threshold_idx]
         actual_tpr = tpr[threshold_idx]
@@ -163,7 +185,10 @@ def main():
     
     if metrics is None:
         return 1
-    
+
+    # Convert curve lists to arrays once, up front
+    _curves_to_arrays(metrics)
+
     # Print evaluation
     print_metrics_summary(metrics)
     print_feature_importance(metrics)
@@ -8,6 +8,8 @@ import pandas as pd
 import numpy as np
 import sqlite3
 import json
+import matplotlib
+matplotlib.use('Agg')  # Batch script: render without an interactive canvas
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
@@ -15,8 +17,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
-from lifelines import KaplanMeierFitter
-import pickle
+import joblib
 import os
 
 # Set up plotting
@@ -32,15 +33,21 @@ def load_data():
         return None, None
     
     conn = sqlite3.connect(db_path)
-    
+
+    # Read both tables inside one explicit transaction so SQLite holds a
+    # single snapshot and shared lock across the queries instead of
+    # re-acquiring per statement
+    conn.execute("BEGIN")
+
     # Load rounds
     rounds_df = pd.read_sql_query("SELECT * FROM rounds", conn)
     print(f"Loaded {len(rounds_df)} rounds")
-    
+
     # Load ticks
     ticks_df = pd.read_sql_query("SELECT * FROM ticks", conn)
     print(f"Loaded {len(ticks_df)} ticks")
-    
+
+    conn.execute("COMMIT")
     conn.close()
     
     return rounds_df, ticks_df
@@ -82,15 +89,17 @@ def survival_analysis(rounds_df):
         print("No complete rounds found for survival analysis")
         return None
     
-    # Fit Kaplan-Meier model
-    kmf = KaplanMeierFitter()
-    kmf.fit(complete_rounds['duration'], event_observed=np.ones(len(complete_rounds)))
-    
+    # With every round fully observed (no censoring) the Kaplan-Meier
+    # estimate collapses to the empirical survival function, so compute it
+    # directly: sort durations and step down by 1/n at each event
+    durations = np.sort(complete_rounds['duration'].to_numpy())
+    survival = np.arange(len(durations), 0, -1, dtype=np.float32) / len(durations)
+
     # Create plots
     plt.figure(figsize=(12, 8))
-    
+
     plt.subplot(2, 2, 1)
-    kmf.plot()
+    plt.step(durations, survival, where='post')
     plt.title('Survival Function: Round Duration')
     plt.xlabel('Time (seconds)')
     plt.ylabel('Survival Probability')
@@ -117,7 +126,7 @@ def survival_analysis(rounds_df):
     
     plt.tight_layout()
     plt.savefig('../data/survival_analysis.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    plt.close()
     
     # Print statistics
     print(f"\nSurvival Analysis Statistics:")
@@ -125,8 +134,8 @@ def survival_analysis(rounds_df):
     print(f"Mean duration: {complete_rounds['duration'].mean():.2f} seconds")
     print(f"Median duration: {complete_rounds['duration'].median():.2f} seconds")
     print(f"Max duration: {complete_rounds['duration'].max():.2f} seconds")
-    
-    return kmf
+
+    return durations, survival
 
 def prepare_training_data(features_df):
     """Prepare data for training rug prediction models"""
@@ -226,38 +235,41 @@ def train_models(X, y_5s, y_10s):
     
     plt.tight_layout()
     plt.savefig('../data/feature_importance.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    plt.close()
     
     return model_5s, model_10s, scaler
 
 def save_model(model_5s, model_10s, scaler, rounds_df):
-    """Save the trained models to JSON format"""
-    
+    """Save the trained models as joblib artifacts plus JSON metadata"""
+
     # Ensure data directory exists
     os.makedirs('../data', exist_ok=True)
-    
-    # Serialize models to hex strings
-    model_5s_hex = pickle.dumps(model_5s).hex()
-    model_10s_hex = pickle.dumps(model_10s).hex()
-    scaler_hex = pickle.dumps(scaler).hex()
-    
-    # Create model data
+
+    # Dump the binary artifacts with joblib: the forest's arrays stay in
+    # native compressed form instead of a pickle hex string that doubles
+    # the size and has to round-trip through the JSON parser on every load
+    joblib.dump(model_5s, '../data/model_5s.joblib', compress=3)
+    joblib.dump(model_10s, '../data/model_10s.joblib', compress=3)
+    joblib.dump(scaler, '../data/scaler.joblib', compress=3)
+
+    # Keep only metadata in the JSON file
     model_data = {
-        'model_5s': model_5s_hex,
-        'model_10s': model_10s_hex,
-        'scaler': scaler_hex,
+        'model_5s_path': 'model_5s.joblib',
+        'model_10s_path': 'model_10s.joblib',
+        'scaler_path': 'scaler.joblib',
         'features': ['x', 'time_since_start', 'slope', 'volatility', 'players', 'totalWager'],
         'rounds_count': len(rounds_df),
         'last_updated': datetime.now().isoformat(),
         'model_type': 'RandomForestClassifier',
         'description': 'Rug prediction models for rugs.fun rounds'
     }
-    
+
     # Save to JSON file
     with open('../data/model.json', 'w') as f:
         json.dump(model_data, f, indent=2)
-    
-    print(f"Model saved to ../data/model.json")
+
+    print(f"Model saved to ../data/model_5s.joblib / model_10s.joblib")
+    print(f"Metadata saved to ../data/model.json")
     print(f"Trained on {len(rounds_df)} rounds")
     print(f"Features: {model_data['features']}")
 
@@ -5,7 +5,9 @@ Detects low_vol, normal, high_vol regimes based on volatility and slope patterns
 """
 
 import json
+import math
 import os
+import pickle
 import sqlite3
 import numpy as np
 import pandas as pd
@@ -13,6 +15,41 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Literal, Any
 from dataclasses import dataclass
 
+# Optional orjson for fast JSON parsing; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _scan_regimes(cs_vol, cs_slope, starts, window, vol_low, vol_high,
+                      slope_low, slope_high):
+        """Classify every sliding window into a regime code in parallel
+
+        Window means come from the prefix sums, so each window is two
+        subtractions plus the threshold branches; codes are 0 low_vol,
+        1 normal, 2 high_vol.
+        """
+        codes = np.empty(len(starts), dtype=np.int8)
+        for i in prange(len(starts)):
+            start = starts[i]
+            vol_mean = (cs_vol[start + window] - cs_vol[start]) / window
+            slope_mean = (cs_slope[start + window] - cs_slope[start]) / window
+            if vol_mean < vol_low and slope_mean < slope_low:
+                codes[i] = 0
+            elif vol_mean > vol_high or slope_mean > slope_high:
+                codes[i] = 2
+            else:
+                codes[i] = 1
+        return codes
+
 @dataclass
 class RegimeConfig:
     """Configuration for regime detection"""
@@ -23,7 +60,9 @@ class RegimeConfig:
     slope_high_threshold: float = 0.15
     min_rounds_per_regime: int = 50
 
-@dataclass
+# slots drops the per-instance __dict__ and frozen makes the record
+# hashable and safe to share; regimes are plain value objects
+@dataclass(slots=True, frozen=True)
 class RegimeInfo:
     """Information about a detected regime"""
     regime: Literal['low_vol', 'normal', 'high_vol']
@@ -42,13 +81,29 @@ class RegimeDetector:
     def __init__(self, config_path: str = "config/regime.json"):
         self.config = self._load_config(config_path)
         self.regimes = []
+
+        # Specialize the threshold decision to this config once: bucketing
+        # the two means against the sorted edges and indexing a 3x3 table
+        # replaces the per-call comparison chain
+        self._vol_edges = np.array([self.config.vol_low_threshold,
+                                    self.config.vol_high_threshold])
+        self._slope_edges = np.array([self.config.slope_low_threshold,
+                                      self.config.slope_high_threshold])
+        self._regime_table = np.array([[0, 1, 2],
+                                       [1, 1, 2],
+                                       [2, 2, 2]], dtype=np.int8)
+        self._regime_labels = ('low_vol', 'normal', 'high_vol')
     
     def _load_config(self, config_path: str) -> RegimeConfig:
         """Load configuration from JSON file"""
         try:
             if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config_dict = json.load(f)
+                if orjson is not None:
+                    with open(config_path, 'rb') as f:
+                        config_dict = orjson.loads(f.read())
+                else:
+                    with open(config_path, 'r') as f:
+                        config_dict = json.load(f)
                 return RegimeConfig(**config_dict)
             else:
                 print(f"Regime config file {config_path} not found, using defaults")
@@ -66,33 +121,63 @@ class RegimeDetector:
             raise FileNotFoundError(f"Database not found at {db_path}")
         
         conn = sqlite3.connect(db_path)
-        
-        # Get recent rounds with their features
+
+        # Keep the recency scan and the per-round tick lookups index walks
+        # rather than full table scans
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rounds_started ON rounds(started_at DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_ticks_round_phase ON ticks(round_id, phase)")
+
+        # Get recent rounds with their features. The inner subquery picks
+        # the lookback window first so the join and GROUP BY only touch
+        # ticks for those rounds instead of aggregating the whole tick
+        # table. SQLite has no built-in STDDEV, so accumulate SUM(x) /
+        # SUM(x*x) / COUNT in one pass and derive mean and standard
+        # deviation per group afterwards — one tick scan, plain arithmetic
+        # on the grouped rows
         query = """
         SELECT r.id, r.started_at, r.ended_at, r.rug_time_s, r.rug_x,
-               AVG(t.x) as avg_x,
-               STDDEV(t.x) as vol_x,
+               SUM(t.x) as sum_x,
+               SUM(t.x * t.x) as sum_x2,
                AVG(ABS(t.slope)) as avg_slope,
                COUNT(t.id) as tick_count
-        FROM rounds r
+        FROM (SELECT id, started_at, ended_at, rug_time_s, rug_x
+              FROM rounds
+              ORDER BY started_at DESC
+              LIMIT ?) r
         LEFT JOIN ticks t ON r.id = t.round_id
         WHERE t.phase = 'live'
         GROUP BY r.id
         ORDER BY r.started_at DESC
-        LIMIT ?
         """
-        
-        rounds_df = pd.read_sql_query(query, conn, params=(lookback_rounds,))
+
+        # Stream the grouped rows in chunks and drop thin rounds as they
+        # arrive, so peak memory is one chunk plus the surviving frame
+        # rather than the full result set plus a filtered copy
+        columns = ['id', 'started_at', 'ended_at', 'rug_time_s', 'rug_x',
+                   'sum_x', 'sum_x2', 'avg_slope', 'tick_count']
+        parts = [chunk[chunk['tick_count'] >= 10]
+                 for chunk in pd.read_sql_query(query, conn, params=(lookback_rounds,),
+                                                chunksize=10_000)]
         conn.close()
-        
+        rounds_df = (pd.concat(parts, copy=False, ignore_index=True) if parts
+                     else pd.DataFrame(columns=columns))
+
+        # Derive per-round mean and std of x from the accumulated sums
+        tick_count = rounds_df['tick_count'].to_numpy(dtype=np.float64)
+        sum_x = rounds_df['sum_x'].to_numpy(dtype=np.float64)
+        sum_x2 = rounds_df['sum_x2'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_x = np.where(tick_count > 0, sum_x / tick_count, 0.0)
+            vol_x = np.sqrt(np.maximum(
+                np.where(tick_count > 0, sum_x2 / tick_count, 0.0) - avg_x ** 2, 0.0))
+        rounds_df['avg_x'] = avg_x
+        rounds_df['vol_x'] = vol_x
+
         # Calculate additional features
         rounds_df['duration_s'] = (rounds_df['ended_at'] - rounds_df['started_at']) / 1000
         rounds_df['volatility'] = rounds_df['vol_x'] / (rounds_df['avg_x'] + 1e-6)
         rounds_df['slope_magnitude'] = rounds_df['avg_slope']
-        
-        # Remove rounds with insufficient data
-        rounds_df = rounds_df[rounds_df['tick_count'] >= 10]
-        
+
         print(f"Loaded {len(rounds_df)} rounds for regime detection")
         return rounds_df
     
@@ -104,14 +189,11 @@ class RegimeDetector:
         # Calculate aggregate statistics
         avg_vol = data['volatility'].mean()
         avg_slope = data['slope_magnitude'].mean()
-        
-        # Determine regime based on thresholds
-        if avg_vol < self.config.vol_low_threshold and avg_slope < self.config.slope_low_threshold:
-            return 'low_vol'
-        elif avg_vol > self.config.vol_high_threshold or avg_slope > self.config.slope_high_threshold:
-            return 'high_vol'
-        else:
-            return 'normal'
+
+        # Determine regime from the precomputed decision table
+        vol_bucket = int(np.searchsorted(self._vol_edges, avg_vol))
+        slope_bucket = int(np.searchsorted(self._slope_edges, avg_slope))
+        return self._regime_labels[self._regime_table[vol_bucket, slope_bucket]]
     
     def detect_regime_changes(self, data: pd.DataFrame) -> List[RegimeInfo]:
         """Detect regime changes over time"""
@@ -121,56 +203,108 @@ class RegimeDetector:
         # Sort by start time (oldest first)
         data = data.sort_values('started_at').reset_index(drop=True)
         
-        regimes = []
-        current_regime = None
-        regime_start = 0
-        
+        n = len(data)
+
         # Use sliding window approach
-        window_size = min(self.config.min_rounds_per_regime, len(data) // 4)
-        
-        for i in range(0, len(data) - window_size + 1, window_size // 2):
-            window_data = data.iloc[i:i + window_size]
-            regime = self.detect_regime(window_data)
-            
-            if regime != current_regime:
-                # End previous regime
-                if current_regime is not None:
-                    regime_info = RegimeInfo(
-                        regime=current_regime,
-                        start_round=data.iloc[regime_start]['id'],
-                        end_round=data.iloc[i-1]['id'],
-                        round_count=i - regime_start,
-                        avg_volatility=data.iloc[regime_start:i]['volatility'].mean(),
-                        avg_slope=data.iloc[regime_start:i]['slope_magnitude'].mean(),
-                        vol_std=data.iloc[regime_start:i]['volatility'].std(),
-                        slope_std=data.iloc[regime_start:i]['slope_magnitude'].std(),
-                        detected_at=datetime.now().isoformat()
-                    )
-                    regimes.append(regime_info)
-                
-                # Start new regime
-                current_regime = regime
-                regime_start = i
-        
-        # Add final regime
-        if current_regime is not None:
+        window_size = min(self.config.min_rounds_per_regime, n // 4)
+
+        starts = np.arange(0, n - window_size + 1, window_size // 2)
+        if len(starts) == 0:
+            return []
+
+        # Classify every window in one pass: cumulative sums give each
+        # window mean as two subtractions, so overlapping windows cost
+        # O(N) total instead of re-reducing every slice in Python
+        vol = data['volatility'].to_numpy(dtype=np.float64)
+        slope = data['slope_magnitude'].to_numpy(dtype=np.float64)
+        cs_vol = np.concatenate(([0.0], np.cumsum(vol)))
+        cs_slope = np.concatenate(([0.0], np.cumsum(slope)))
+        cs_vol2 = np.concatenate(([0.0], np.cumsum(vol * vol)))
+        cs_slope2 = np.concatenate(([0.0], np.cumsum(slope * slope)))
+        vol_mean = (cs_vol[starts + window_size] - cs_vol[starts]) / window_size
+        slope_mean = (cs_slope[starts + window_size] - cs_slope[starts]) / window_size
+
+        # Integer-code the regimes against the config thresholds; windows
+        # below the minimum round count default to 'normal' as detect_regime
+        # does
+        labels = ('low_vol', 'normal', 'high_vol')
+        if window_size < self.config.min_rounds_per_regime:
+            codes = np.ones(len(starts), dtype=np.int8)
+        elif HAS_NUMBA:
+            codes = _scan_regimes(cs_vol, cs_slope, starts.astype(np.int64),
+                                  window_size,
+                                  self.config.vol_low_threshold,
+                                  self.config.vol_high_threshold,
+                                  self.config.slope_low_threshold,
+                                  self.config.slope_high_threshold)
+        else:
+            low = ((vol_mean < self.config.vol_low_threshold)
+                   & (slope_mean < self.config.slope_low_threshold))
+            high = ((vol_mean > self.config.vol_high_threshold)
+                    | (slope_mean > self.config.slope_high_threshold))
+            codes = np.where(low, 0, np.where(high, 2, 1)).astype(np.int8)
+
+        # Regime boundaries are the windows where the code changes; segment
+        # stats come from plain integer-indexed array slices rather than
+        # .iloc dispatch through the pandas indexing machinery
+        segment_idx = np.concatenate(([0], np.flatnonzero(np.diff(codes) != 0) + 1))
+        ids = data['id'].to_numpy()
+
+        # Segment means and stds come straight from the prefix sums: for a
+        # segment [a, b) the population variance is E[x^2] - E[x]^2, scaled
+        # by m/(m-1) for the sample std the reports have always quoted
+        def _segment_stats(cs, cs2, a, b):
+            m = b - a
+            mean = (cs[b] - cs[a]) / m
+            if m < 2:
+                return mean, float('nan')
+            var = max((cs2[b] - cs2[a]) / m - mean * mean, 0.0)
+            return mean, math.sqrt(var * m / (m - 1))
+
+        regimes = []
+        for k, seg in enumerate(segment_idx):
+            regime_start = int(starts[seg])
+            if k + 1 < len(segment_idx):
+                regime_end = int(starts[segment_idx[k + 1]])
+            else:
+                regime_end = n
+            vol_avg, vol_std = _segment_stats(cs_vol, cs_vol2, regime_start, regime_end)
+            slope_avg, slope_std = _segment_stats(cs_slope, cs_slope2, regime_start, regime_end)
             regime_info = RegimeInfo(
-                regime=current_regime,
-                start_round=data.iloc[regime_start]['id'],
-                end_round=data.iloc[-1]['id'],
-                round_count=len(data) - regime_start,
-                avg_volatility=data.iloc[regime_start:]['volatility'].mean(),
-                avg_slope=data.iloc[regime_start:]['slope_magnitude'].mean(),
-                vol_std=data.iloc[regime_start:]['volatility'].std(),
-                slope_std=data.iloc[regime_start:]['slope_magnitude'].std(),
+                regime=labels[codes[seg]],
+                start_round=ids[regime_start],
+                end_round=ids[regime_end - 1],
+                round_count=regime_end - regime_start,
+                avg_volatility=float(vol_avg),
+                avg_slope=float(slope_avg),
+                vol_std=vol_std,
+                slope_std=slope_std,
                 detected_at=datetime.now().isoformat()
             )
             regimes.append(regime_info)
-        
+
         return regimes
     
     def get_current_regime(self, db_path: str) -> RegimeInfo:
-        """Get the current market regime"""
+        """Get the current market regime
+
+        The answer only changes when the database does, and cron/CI call
+        this repeatedly between rounds, so the result is persisted on disk
+        keyed on the database file's mtime and size — an unchanged DB is a
+        sub-millisecond cache read instead of a query plus feature pass.
+        """
+        cache_path = os.path.join(os.path.dirname(db_path) or '.', '.regime_cache.pkl')
+        cache_key = None
+        try:
+            stat = os.stat(db_path)
+            cache_key = (db_path, stat.st_mtime_ns, stat.st_size)
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('key') == cache_key:
+                return cached['regime_info']
+        except Exception:
+            pass
+
         data = self.load_recent_data(db_path)
         current_regime = self.detect_regime(data)
         
@@ -186,7 +320,14 @@ class RegimeDetector:
             slope_std=data['slope_magnitude'].std() if len(data) > 0 else 0,
             detected_at=datetime.now().isoformat()
         )
-        
+
+        if cache_key is not None:
+            try:
+                with open(cache_path, 'wb') as f:
+                    pickle.dump({'key': cache_key, 'regime_info': regime_info}, f)
+            except Exception:
+                pass
+
         return regime_info
     
     def save_regime_thresholds(self, regime: str, thresholds: Dict[str, Any]) -> None:
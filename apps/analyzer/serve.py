@@ -4,9 +4,12 @@ Prediction API Server for Rugs Research
 Supports model registry and versioning
 """
 
+import asyncio
 import json
 import os
 import pickle
+import threading
+import joblib
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from fastapi import FastAPI, HTTPException
@@ -14,6 +17,15 @@ from pydantic import BaseModel
 import uvicorn
 import numpy as np
 import sqlite3
+from scipy.special import expit
+
+# Optional orjson-backed responses: orjson serializes dicts (including
+# numpy scalars) several times faster than the stdlib encoder
+try:
+    import orjson  # noqa: F401  (ORJSONResponse imports it lazily)
+    from fastapi.responses import ORJSONResponse as _ResponseClass
+except ImportError:
+    from fastapi.responses import JSONResponse as _ResponseClass
 
 # Pydantic models for API
 class PredictionRequest(BaseModel):
@@ -48,19 +60,77 @@ class ModelSwitchRequest(BaseModel):
 # Global model state
 model_5s = None
 model_10s = None
-scaler = None
+scaler_mean = None
+scaler_inv_scale = None
+linear_5s = None
+linear_10s = None
 model_info = {"trained": False}
 current_model_path = None
 
+def _linear_params(model):
+    """Extract (coef, intercept) as float32 arrays from a linear model
+
+    Returns None for estimators without linear parameters (tree models).
+    """
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return (np.asarray(model.coef_, dtype=np.float32).reshape(1, -1),
+                np.asarray(model.intercept_, dtype=np.float32))
+    return None
+
+# Micro-batching for /predict: per-sample inference cost is dominated by
+# fixed per-call overhead, so concurrent requests are coalesced into one
+# predict_proba call. A request waits at most PREDICT_MAX_LATENCY_MS for
+# companions; the bounded queue sheds load instead of growing tail latency.
+PREDICT_MAX_BATCH = 64
+PREDICT_MAX_LATENCY_MS = 5
+PREDICT_QUEUE_SIZE = 1024
+_predict_queue: Optional[asyncio.Queue] = None
+
+async def _predict_batcher():
+    """Drain the predict queue, batching rows into single model calls"""
+    while True:
+        batch = [await _predict_queue.get()]
+        deadline = asyncio.get_event_loop().time() + PREDICT_MAX_LATENCY_MS / 1000.0
+        while len(batch) < PREDICT_MAX_BATCH:
+            remaining = deadline - asyncio.get_event_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_predict_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        rows = np.stack([row for row, _ in batch])
+        futures = [future for _, future in batch]
+        try:
+            if scaler_mean is not None:
+                rows = (rows - scaler_mean) * scaler_inv_scale
+            if linear_5s is not None:
+                p_5s = expit(rows @ linear_5s[0].T + linear_5s[1]).ravel()
+            else:
+                p_5s = model_5s.predict_proba(rows)[:, 1]
+            if linear_10s is not None:
+                p_10s = expit(rows @ linear_10s[0].T + linear_10s[1]).ravel()
+            else:
+                p_10s = model_10s.predict_proba(rows)[:, 1]
+            for i, future in enumerate(futures):
+                if not future.done():
+                    future.set_result((float(p_5s[i]), float(p_10s[i])))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
 app = FastAPI(
     title="Rugs Research API",
     description="Prediction API for rugs.fun analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_ResponseClass
 )
 
 def load_model(model_path: str = None) -> bool:
     """Load model from specified path or try registry paths"""
-    global model_5s, model_10s, scaler, model_info, current_model_path
+    global model_5s, model_10s, scaler_mean, scaler_inv_scale, linear_5s, linear_10s, model_info, current_model_path
     
     # Try different model paths in order of preference
     model_paths = []
@@ -83,11 +153,45 @@ def load_model(model_path: str = None) -> bool:
             with open(path, 'r') as f:
                 data = json.load(f)
             
-            # Deserialize models and scaler
-            model_5s = pickle.loads(bytes.fromhex(data['model_5s']))
-            model_10s = pickle.loads(bytes.fromhex(data['model_10s']))
-            scaler = pickle.loads(bytes.fromhex(data['scaler']))
-            
+            # Current artifacts keep only metadata in the JSON and reference
+            # joblib sidecar files; mmap the estimator arrays so a reload is
+            # a page-in rather than a hex decode plus full pickle walk
+            base_dir = os.path.dirname(path) or '.'
+            if 'model_5s_path' in data:
+                model_5s = joblib.load(os.path.join(base_dir, data['model_5s_path']), mmap_mode='r')
+                model_10s = joblib.load(os.path.join(base_dir, data['model_10s_path']), mmap_mode='r')
+            else:
+                # Legacy artifacts embed the models as hex-encoded pickles
+                model_5s = pickle.loads(bytes.fromhex(data['model_5s']))
+                model_10s = pickle.loads(bytes.fromhex(data['model_10s']))
+
+            # Artifacts trained with a StandardScaler ship it as a joblib
+            # sidecar (scaler_path) or, in the legacy format, as embedded
+            # hex. Either way, cache its fitted parameters as float32
+            # arrays once: the per-request transform is then a single
+            # (X - mean) * inv_scale expression with no sklearn dispatch
+            # on the prediction path
+            if data.get('scaler_path'):
+                fitted_scaler = joblib.load(os.path.join(base_dir, data['scaler_path']))
+            elif data.get('scaler'):
+                fitted_scaler = pickle.loads(bytes.fromhex(data['scaler']))
+            else:
+                fitted_scaler = None
+
+            if fitted_scaler is not None:
+                scaler_mean = fitted_scaler.mean_.astype(np.float32)
+                scaler_inv_scale = (1.0 / fitted_scaler.scale_).astype(np.float32)
+            else:
+                scaler_mean = None
+                scaler_inv_scale = None
+
+            # Linear models expose their fitted parameters, so the hot path
+            # can bypass sklearn dispatch entirely with a GEMV + sigmoid on
+            # cached float32 coefficients. Tree models keep predict_proba,
+            # which the batcher already amortizes.
+            linear_5s = _linear_params(model_5s)
+            linear_10s = _linear_params(model_10s)
+
             # Update model info
             model_info = {
                 "trained": True,
@@ -108,43 +212,64 @@ def load_model(model_path: str = None) -> bool:
     print("❌ No valid model found")
     return False
 
+# Stats connection is opened once and kept: per-/health connect plus
+# statement compilation cost more than the queries themselves
+_db_conn: Optional[sqlite3.Connection] = None
+_db_lock = threading.Lock()
+
+def _get_db_conn() -> sqlite3.Connection:
+    """Open the stats connection on first use, tuned for repeated reads"""
+    global _db_conn
+    if _db_conn is None:
+        conn = sqlite3.connect('../data/rugs.sqlite', check_same_thread=False,
+                               cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-20000")
+        _db_conn = conn
+    return _db_conn
+
 def get_db_stats() -> dict:
     """Get database statistics"""
     try:
-        conn = sqlite3.connect('../data/rugs.sqlite')
-        cursor = conn.cursor()
-        
-        # Get table counts
-        cursor.execute("SELECT COUNT(*) FROM rounds")
-        rounds_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM ticks")
-        ticks_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM events")
-        events_count = cursor.fetchone()[0]
-        
-        # Get latest round
-        cursor.execute("SELECT MAX(ended_at) FROM rounds WHERE ended_at IS NOT NULL")
-        latest_round = cursor.fetchone()[0]
-        
-        conn.close()
-        
+        with _db_lock:
+            conn = _get_db_conn()
+            # One round trip for all four stats; the compiled statement is
+            # reused from the connection's statement cache on later calls
+            row = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM rounds),
+                    (SELECT COUNT(*) FROM ticks),
+                    (SELECT COUNT(*) FROM events),
+                    (SELECT MAX(ended_at) FROM rounds WHERE ended_at IS NOT NULL)
+            """).fetchone()
+
         return {
-            "rounds": rounds_count,
-            "ticks": ticks_count,
-            "events": events_count,
-            "latest_round": latest_round
+            "rounds": row[0],
+            "ticks": row[1],
+            "events": row[2],
+            "latest_round": row[3]
         }
     except Exception as e:
         return {"error": str(e)}
 
+# Parsed registry listing, keyed on the models directory mtime: adding or
+# removing a model touches the directory, so the scan and per-file JSON
+# reads only re-run when the registry actually changed
+_models_cache: Optional[tuple] = None
+
 def get_available_models() -> List[ModelVersion]:
     """Get list of available model versions"""
+    global _models_cache
     models_dir = "../models"
     if not os.path.exists(models_dir):
         return []
-    
+
+    dir_mtime = os.stat(models_dir).st_mtime_ns
+    if _models_cache is not None and _models_cache[0] == dir_mtime:
+        return _models_cache[1]
+
     models = []
     current_model = None
     
@@ -181,6 +306,7 @@ def get_available_models() -> List[ModelVersion]:
     
     # Sort by training date (newest first)
     models.sort(key=lambda x: x.trained_at, reverse=True)
+    _models_cache = (dir_mtime, models)
     return models
 
 def switch_model(version: str) -> bool:
@@ -215,6 +341,13 @@ def switch_model(version: str) -> bool:
     else:
         return False
 
+@app.on_event("startup")
+async def start_predict_batcher():
+    """Create the predict queue on the running loop and start the batcher"""
+    global _predict_queue
+    _predict_queue = asyncio.Queue(maxsize=PREDICT_QUEUE_SIZE)
+    asyncio.get_event_loop().create_task(_predict_batcher())
+
 @app.get("/")
 async def root():
     """Root endpoint with basic info"""
@@ -228,7 +361,9 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    db_stats = get_db_stats()
+    # get_db_stats blocks on sqlite; run it off the event loop so health
+    # probes don't serialize in-flight requests
+    db_stats = await asyncio.to_thread(get_db_stats)
     return {
         "status": "healthy",
         "model_loaded": model_info["trained"],
@@ -245,12 +380,13 @@ async def model_info_endpoint():
 @app.get("/models", response_model=List[ModelVersion])
 async def list_models():
     """Get list of available model versions"""
-    return get_available_models()
+    # Directory scan and JSON reads block; keep them off the event loop
+    return await asyncio.to_thread(get_available_models)
 
 @app.post("/models/switch")
 async def switch_model_endpoint(request: ModelSwitchRequest):
     """Switch to a different model version"""
-    if switch_model(request.version):
+    if await asyncio.to_thread(switch_model, request.version):
         return {"success": True, "version": request.version}
     else:
         raise HTTPException(status_code=404, detail=f"Model version {request.version} not found")
@@ -263,39 +399,44 @@ async def predict(request: PredictionRequest):
     
     try:
         # Prepare features
-        features = np.array([[
+        features = np.array([
             request.x,
             request.t,
             request.slope,
             request.vol,
             request.players,
             request.wager
-        ]])
-        
-        # Scale features
-        features_scaled = scaler.transform(features)
-        
-        # Make predictions
-        p_rug_5s = float(model_5s.predict_proba(features_scaled)[0][1])
-        p_rug_10s = float(model_10s.predict_proba(features_scaled)[0][1])
-        
-        return PredictionResponse(
-            p_rug_5s=p_rug_5s,
-            p_rug_10s=p_rug_10s,
-            meta={
+        ], dtype=np.float32)
+
+        # Hand the row to the batcher and wait for its slice of the result
+        future = asyncio.get_event_loop().create_future()
+        try:
+            _predict_queue.put_nowait((features, future))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Prediction queue full")
+        p_rug_5s, p_rug_10s = await future
+
+        # Return a response directly: the payload is already plain floats
+        # and strings, so pydantic's re-encoding pass adds nothing
+        return _ResponseClass(content={
+            "p_rug_5s": p_rug_5s,
+            "p_rug_10s": p_rug_10s,
+            "meta": {
                 "version": model_info.get("version", "unknown"),
                 "trained_at": model_info.get("trained_at", "unknown"),
                 "features_used": model_info.get("features", []),
                 "prediction_time": datetime.now().isoformat()
             }
-        )
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 @app.post("/reload-model")
 async def reload_model():
     """Reload the current model"""
-    if load_model():
+    if await asyncio.to_thread(load_model):
         return {"success": True, "model_info": model_info}
     else:
         raise HTTPException(status_code=500, detail="Failed to reload model")
@@ -35,7 +35,10 @@ class StrategySimulator:
         # Load data
         self.rounds_df, self.ticks_df = self._load_data()
         self.model = self._load_model()
-        
+
+        # Completed-round arrays shared by every strategy, built lazily
+        self._rounds_arrays = None
+
         # Simulation results
         self.results = {}
     
@@ -43,31 +46,49 @@ class StrategySimulator:
         """Load rounds and ticks data from SQLite"""
         if not os.path.exists(self.db_path):
             print(f"❌ Database not found: {self.db_path}")
+            self.tick_round_ids = pd.Series([], dtype='int64')
             return pd.DataFrame(), pd.DataFrame()
         
         try:
             conn = sqlite3.connect(self.db_path)
-            
+
             # Load rounds
             rounds_df = pd.read_sql_query("""
-                SELECT * FROM rounds 
-                WHERE ended_at IS NOT NULL 
+                SELECT * FROM rounds
+                WHERE ended_at IS NOT NULL
                 ORDER BY started_at
             """, conn)
-            
-            # Load ticks
-            ticks_df = pd.read_sql_query("""
-                SELECT * FROM ticks 
-                ORDER BY ts
-            """, conn)
-            
+
+            # The strategies only ever read live-phase ticks and four
+            # columns, so project and filter in SQL instead of
+            # materializing the full table; the index keeps the scan in
+            # the (round_id, ts) order the simulations consume
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ticks_round ON ticks(round_id, ts)")
+            tick_columns = ['round_id', 'ts', 'x', 'phase']
+            chunks = [chunk for chunk in pd.read_sql_query("""
+                SELECT round_id, ts, x, phase FROM ticks
+                WHERE phase = 'live'
+                ORDER BY round_id, ts
+            """, conn, chunksize=100_000)]
+            if chunks:
+                ticks_df = pd.concat(chunks, ignore_index=True)
+            else:
+                ticks_df = pd.DataFrame(columns=tick_columns)
+
+            # Rounds with any tick at all (any phase) still count as
+            # simulatable; track their ids without loading the other phases
+            self.tick_round_ids = pd.read_sql_query(
+                "SELECT DISTINCT round_id FROM ticks", conn)['round_id']
+
             conn.close()
-            
-            print(f"✓ Loaded {len(rounds_df)} rounds and {len(ticks_df)} ticks")
+
+            print(f"✓ Loaded {len(rounds_df)} rounds and {len(ticks_df)} live ticks")
             return rounds_df, ticks_df
-            
+
         except Exception as e:
             print(f"❌ Error loading data: {e}")
+            self.tick_round_ids = pd.Series([], dtype='int64')
             return pd.DataFrame(), pd.DataFrame()
     
     def _load_model(self) -> Optional[Dict]:
@@ -116,195 +137,228 @@ class StrategySimulator:
         
         return {'p_rug_5s': p_rug_5s, 'p_rug_10s': p_rug_10s}
     
-    def simulate_naive_strategy(self, cashout_multiplier: float = 2.0) -> Dict[str, Any]:
-        """Simulate naive strategy: always hold to target multiplier"""
-        print(f"Simulating Naive Strategy (cashout at {cashout_multiplier}x)...")
-        
-        bm = create_bankroll_manager(initial_balance=self.initial_balance)
-        equity_curve = [self.initial_balance]
-        trades = []
-        
-        for _, round_data in self.rounds_df.iterrows():
-            if pd.isna(round_data['rug_x']):
-                continue  # Skip incomplete rounds
-            
-            # Simulate holding to target multiplier
-            target_reached = round_data['rug_x'] >= cashout_multiplier
-            
-            if target_reached:
-                # Win: profit = bet_amount * (cashout_multiplier - 1)
-                bet_amount = bm.state['balance'] * 0.1  # 10% of balance
-                profit = bet_amount * (cashout_multiplier - 1)
-                result = bm.update_balance(bet_amount, profit)
-                trades.append({
-                    'round_id': round_data['id'],
-                    'strategy': 'naive',
-                    'bet_amount': bet_amount,
-                    'result': profit,
-                    'balance': result['new_balance']
-                })
+    def _completed_rounds(self) -> tuple:
+        """Shared (round_ids, rug_x) arrays for completed rounds
+
+        Every strategy filters the same column the same way, so the arrays
+        are extracted once and reused across the whole simulation run.
+        """
+        if self._rounds_arrays is None:
+            if 'rug_x' not in self.rounds_df:
+                self._rounds_arrays = (np.array([], dtype='int64'),
+                                       np.array([], dtype=np.float64))
             else:
-                # Loss: lose bet amount
-                bet_amount = bm.state['balance'] * 0.1
-                result = bm.update_balance(bet_amount, -bet_amount)
-                trades.append({
-                    'round_id': round_data['id'],
+                rug_x = self.rounds_df['rug_x'].to_numpy(dtype=np.float64)
+                valid = ~np.isnan(rug_x)
+                self._rounds_arrays = (self.rounds_df['id'].to_numpy()[valid],
+                                       rug_x[valid])
+        return self._rounds_arrays
+
+    def simulate_naive_strategy(self, cashout_multiplier: float = 2.0,
+                                collect_trades: bool = True) -> Dict[str, Any]:
+        """Simulate naive strategy: always hold to target multiplier"""
+        return self.simulate_naive_strategies([cashout_multiplier], collect_trades)[0]
+
+    def simulate_naive_strategies(self, cashout_multipliers: List[float],
+                                  collect_trades: bool = True) -> List[Dict[str, Any]]:
+        """Simulate the naive strategy for several targets in one pass
+
+        Betting 10% of balance each round makes every balance path a pure
+        geometric product of per-round multipliers, and the targets only
+        differ in the win condition, so all of them broadcast against the
+        same rug_x array as one (num_targets, num_rounds) computation.
+        """
+        for cashout_multiplier in cashout_multipliers:
+            print(f"Simulating Naive Strategy (cashout at {cashout_multiplier}x)...")
+
+        round_ids, rug_x = self._completed_rounds()
+        targets = np.asarray(cashout_multipliers, dtype=np.float64)[:, None]
+
+        win = rug_x[None, :] >= targets
+        multiplier = np.where(win, 1 + 0.1 * (targets - 1), 0.9)
+        equity = self.initial_balance * np.cumprod(multiplier, axis=1)
+        balance_before = np.concatenate(
+            (np.full((len(cashout_multipliers), 1), self.initial_balance),
+             equity[:, :-1]), axis=1)
+        bet_amount = 0.1 * balance_before
+        result = np.where(win, bet_amount * (targets - 1), -bet_amount)
+
+        results = []
+        for s in range(len(cashout_multipliers)):
+            equity_curve = [self.initial_balance] + equity[s].tolist()
+            trades = []
+            if collect_trades:
+                trades = [{
+                    'round_id': rid,
                     'strategy': 'naive',
-                    'bet_amount': bet_amount,
-                    'result': -bet_amount,
-                    'balance': result['new_balance']
-                })
-            
-            equity_curve.append(result['new_balance'])
-        
-        return self._calculate_strategy_metrics('naive', equity_curve, trades, bm)
+                    'bet_amount': bet,
+                    'result': res,
+                    'balance': bal
+                } for rid, bet, res, bal in zip(round_ids.tolist(),
+                                                bet_amount[s].tolist(),
+                                                result[s].tolist(),
+                                                equity[s].tolist())]
+            results.append(
+                self._calculate_strategy_metrics('naive', equity_curve, trades, None))
+
+        return results
     
-    def simulate_model_guided_strategy(self, 
+    def simulate_model_guided_strategy(self,
                                      cashout_threshold: float = 0.3,
-                                     sidebet_threshold: float = 0.4) -> Dict[str, Any]:
+                                     sidebet_threshold: float = 0.4,
+                                     collect_trades: bool = True) -> Dict[str, Any]:
         """Simulate model-guided strategy based on predicted rug probability"""
         print(f"Simulating Model-Guided Strategy (cashout at {cashout_threshold}, sidebet at {sidebet_threshold})...")
-        
-        bm = create_bankroll_manager(initial_balance=self.initial_balance)
-        equity_curve = [self.initial_balance]
+
+        # Rounds are simulated in started_at order, skipping incomplete
+        # rounds and rounds without any ticks, as the tick loop did
+        if 'rug_x' not in self.rounds_df:
+            return self._calculate_strategy_metrics('model_guided',
+                                                    [self.initial_balance], [], None)
+        rounds = self.rounds_df.loc[~self.rounds_df['rug_x'].isna(),
+                                    ['id', 'started_at', 'rug_x']]
+        rounds = rounds[rounds['id'].isin(self.tick_round_ids)]
+        if len(rounds) == 0:
+            return self._calculate_strategy_metrics('model_guided',
+                                                    [self.initial_balance], [], None)
+
+        # Score every live tick at once: the toy prediction is elementwise
+        # in x and time-since-start, so both probabilities are single array
+        # expressions instead of per-tick dict round trips
+        started = rounds.set_index('id')['started_at']
+        live = self.ticks_df[self.ticks_df['phase'] == 'live']
+        live = live[live['round_id'].isin(started.index)]
+        live = live.sort_values(['round_id', 'ts'], kind='stable')
+        tick_rid = live['round_id'].to_numpy()
+        tick_x = live['x'].to_numpy(dtype=np.float64)
+        t = (live['ts'].to_numpy() - live['round_id'].map(started).to_numpy()) / 1000.0
+        if self.model:
+            p5 = np.minimum(0.8, 0.1 + (tick_x - 1.0) * 0.1 + (t / 60.0) * 0.2)
+            p10 = np.minimum(0.9, p5 + 0.1)
+        else:
+            # Dummy predictions when no model is available
+            p5 = np.full(len(live), 0.1)
+            p10 = np.full(len(live), 0.2)
+
+        # First triggering tick per round: cashout wins ties because the
+        # sidebet branch was only reached when the cashout check failed
+        cash = p5 > cashout_threshold
+        trig = cash | (p10 > sidebet_threshold)
+        uniq_rid, run_starts = np.unique(tick_rid, return_index=True)
+        run_ends = np.append(run_starts[1:], len(tick_rid))
+        trig_idx = np.flatnonzero(trig)
+        pos = np.searchsorted(trig_idx, run_starts)
+        pos_c = np.minimum(pos, max(len(trig_idx) - 1, 0))
+        if len(trig_idx):
+            first = np.where((pos < len(trig_idx)) & (trig_idx[pos_c] < run_ends),
+                             trig_idx[pos_c], -1)
+        else:
+            first = np.full(len(uniq_rid), -1)
+
+        # Align per-round trigger info with the rounds order; with no live
+        # ticks at all every round takes the hold branch, as the old loop did
+        r_ids = rounds['id'].to_numpy()
+        rug = rounds['rug_x'].to_numpy(dtype=np.float64)
+        if len(uniq_rid):
+            li = np.searchsorted(uniq_rid, r_ids)
+            li_c = np.minimum(li, len(uniq_rid) - 1)
+            has_live = (li < len(uniq_rid)) & (uniq_rid[li_c] == r_ids)
+            fi = np.where(has_live, first[li_c], -1)
+            triggered = fi >= 0
+            fi_c = np.maximum(fi, 0)
+            trig_x = np.where(triggered, tick_x[fi_c], 0.0)
+            is_cash = triggered & cash[fi_c]
+        else:
+            # No live ticks anywhere: nothing triggers
+            triggered = np.zeros(len(r_ids), dtype=bool)
+            trig_x = np.zeros(len(r_ids))
+            is_cash = triggered
+        bet_frac = np.where(is_cash, 0.1, 0.05)
+
+        # Per-round balance multiplier, then the same geometric cumprod as
+        # the other strategies. A trigger at x <= 1 leaves the balance
+        # untouched, matching the old loop's skipped trade.
+        multiplier = np.ones(len(r_ids))
+        gain = triggered & (trig_x > 1.0)
+        multiplier[gain] = 1 + bet_frac[gain] * (trig_x[gain] - 1)
+        hold = ~triggered
+        multiplier[hold] = np.where(rug[hold] >= 2.0, 1.1, 0.9)
+        equity = self.initial_balance * np.cumprod(multiplier)
+        balance_before = np.concatenate(([self.initial_balance], equity[:-1]))
+
+        equity_curve = [self.initial_balance] + equity.tolist()
         trades = []
-        
-        for _, round_data in self.rounds_df.iterrows():
-            if pd.isna(round_data['rug_x']):
-                continue
-            
-            # Get ticks for this round
-            round_ticks = self.ticks_df[self.ticks_df['round_id'] == round_data['id']]
-            if len(round_ticks) == 0:
-                continue
-            
-            # Simulate decision making based on model predictions
-            action_taken = False
-            
-            for _, tick in round_ticks.iterrows():
-                if tick['phase'] != 'live':
-                    continue
-                
-                features = self._calculate_features(tick, round_data['started_at'])
-                prediction = self._get_prediction(features)
-                
-                # Decision logic
-                if prediction['p_rug_5s'] > cashout_threshold:
-                    # Cash out early
-                    bet_amount = bm.state['balance'] * 0.1
-                    current_multiplier = features['x']
-                    if current_multiplier > 1.0:
-                        profit = bet_amount * (current_multiplier - 1)
-                        result = bm.update_balance(bet_amount, profit)
-                        trades.append({
-                            'round_id': round_data['id'],
-                            'strategy': 'model_guided',
-                            'action': 'cashout',
-                            'multiplier': current_multiplier,
-                            'bet_amount': bet_amount,
-                            'result': profit,
-                            'balance': result['new_balance']
-                        })
-                    action_taken = True
-                    break
-                
-                elif prediction['p_rug_10s'] > sidebet_threshold:
-                    # Arm sidebet (reduce position)
-                    bet_amount = bm.state['balance'] * 0.05  # Smaller bet
-                    current_multiplier = features['x']
-                    if current_multiplier > 1.0:
-                        profit = bet_amount * (current_multiplier - 1)
-                        result = bm.update_balance(bet_amount, profit)
-                        trades.append({
-                            'round_id': round_data['id'],
-                            'strategy': 'model_guided',
-                            'action': 'sidebet',
-                            'multiplier': current_multiplier,
-                            'bet_amount': bet_amount,
-                            'result': profit,
-                            'balance': result['new_balance']
-                        })
-                    action_taken = True
-                    break
-            
-            # If no action taken, hold to rug or 2x
-            if not action_taken:
-                bet_amount = bm.state['balance'] * 0.1
-                if round_data['rug_x'] >= 2.0:
-                    profit = bet_amount * (2.0 - 1)
-                    result = bm.update_balance(bet_amount, profit)
+        if collect_trades:
+            rids, eq, bb = r_ids.tolist(), equity.tolist(), balance_before.tolist()
+            for i in range(len(rids)):
+                if triggered[i]:
+                    if trig_x[i] <= 1.0:
+                        continue
+                    bet_amount = bb[i] * (0.1 if is_cash[i] else 0.05)
                     trades.append({
-                        'round_id': round_data['id'],
+                        'round_id': rids[i],
                         'strategy': 'model_guided',
-                        'action': 'hold_to_2x',
-                        'multiplier': 2.0,
+                        'action': 'cashout' if is_cash[i] else 'sidebet',
+                        'multiplier': float(trig_x[i]),
                         'bet_amount': bet_amount,
-                        'result': profit,
-                        'balance': result['new_balance']
+                        'result': bet_amount * (float(trig_x[i]) - 1),
+                        'balance': eq[i]
                     })
                 else:
-                    result = bm.update_balance(bet_amount, -bet_amount)
+                    bet_amount = bb[i] * 0.1
+                    won = rug[i] >= 2.0
                     trades.append({
-                        'round_id': round_data['id'],
+                        'round_id': rids[i],
                         'strategy': 'model_guided',
-                        'action': 'rugged',
-                        'multiplier': round_data['rug_x'],
+                        'action': 'hold_to_2x' if won else 'rugged',
+                        'multiplier': 2.0 if won else float(rug[i]),
                         'bet_amount': bet_amount,
-                        'result': -bet_amount,
-                        'balance': result['new_balance']
+                        'result': bet_amount if won else -bet_amount,
+                        'balance': eq[i]
                     })
-            
-            equity_curve.append(bm.state['balance'])
-        
-        return self._calculate_strategy_metrics('model_guided', equity_curve, trades, bm)
+
+        return self._calculate_strategy_metrics('model_guided', equity_curve, trades, None)
     
-    def simulate_random_strategy(self, bet_probability: float = 0.5) -> Dict[str, Any]:
+    def simulate_random_strategy(self, bet_probability: float = 0.5,
+                                 collect_trades: bool = True) -> Dict[str, Any]:
         """Simulate random strategy as baseline"""
         print(f"Simulating Random Strategy (bet probability: {bet_probability})...")
-        
-        bm = create_bankroll_manager(initial_balance=self.initial_balance)
-        equity_curve = [self.initial_balance]
+
+        round_ids, rug_x = self._completed_rounds()
+        n = len(rug_x)
+
+        # Draw all the coin flips and cashout targets up front, then the
+        # balance path is the same geometric cumprod as the naive strategy
+        # with skipped rounds contributing a multiplier of 1
+        rng = np.random.default_rng()
+        bet_mask = rng.random(n) < bet_probability
+        targets = rng.uniform(1.5, 3.0, n)
+        win = rug_x >= targets
+
+        multiplier = np.where(bet_mask,
+                              np.where(win, 1 + 0.1 * (targets - 1), 0.9),
+                              1.0)
+        equity = self.initial_balance * np.cumprod(multiplier)
+        balance_before = np.concatenate(([self.initial_balance], equity[:-1]))
+        bet_amount = 0.1 * balance_before
+        result = np.where(win, bet_amount * (targets - 1), -bet_amount)
+
+        equity_curve = [self.initial_balance] + equity.tolist()
         trades = []
-        
-        for _, round_data in self.rounds_df.iterrows():
-            if pd.isna(round_data['rug_x']):
-                continue
-            
-            # Randomly decide whether to bet
-            if np.random.random() < bet_probability:
-                bet_amount = bm.state['balance'] * 0.1
-                
-                # Randomly decide when to cash out (between 1.5x and 3x)
-                target_multiplier = np.random.uniform(1.5, 3.0)
-                
-                if round_data['rug_x'] >= target_multiplier:
-                    profit = bet_amount * (target_multiplier - 1)
-                    result = bm.update_balance(bet_amount, profit)
-                    trades.append({
-                        'round_id': round_data['id'],
-                        'strategy': 'random',
-                        'target_multiplier': target_multiplier,
-                        'bet_amount': bet_amount,
-                        'result': profit,
-                        'balance': result['new_balance']
-                    })
-                else:
-                    result = bm.update_balance(bet_amount, -bet_amount)
-                    trades.append({
-                        'round_id': round_data['id'],
-                        'strategy': 'random',
-                        'target_multiplier': target_multiplier,
-                        'bet_amount': bet_amount,
-                        'result': -bet_amount,
-                        'balance': result['new_balance']
-                    })
-                
-                equity_curve.append(result['new_balance'])
-            else:
-                # Skip this round
-                equity_curve.append(bm.state['balance'])
-        
-        return self._calculate_strategy_metrics('random', equity_curve, trades, bm)
+        if collect_trades:
+            bet_idx = np.flatnonzero(bet_mask)
+            rids, tgts = round_ids.tolist(), targets.tolist()
+            bets, results, eq = bet_amount.tolist(), result.tolist(), equity.tolist()
+            trades = [{
+                'round_id': rids[i],
+                'strategy': 'random',
+                'target_multiplier': tgts[i],
+                'bet_amount': bets[i],
+                'result': results[i],
+                'balance': eq[i]
+            } for i in bet_idx.tolist()]
+
+        return self._calculate_strategy_metrics('random', equity_curve, trades, None)
     
     def _calculate_strategy_metrics(self, strategy_name: str, equity_curve: List[float], 
                                   trades: List[Dict], bm) -> Dict[str, Any]:
@@ -350,25 +404,21 @@ class StrategySimulator:
     
     def _calculate_max_drawdown(self, equity_curve: np.ndarray) -> float:
         """Calculate maximum drawdown"""
-        peak = equity_curve[0]
-        max_dd = 0
-        
-        for value in equity_curve:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak
-            max_dd = max(max_dd, dd)
-        
-        return max_dd
+        # Running peak is a single accumulate; the deepest drawdown is the
+        # largest relative distance below it
+        peaks = np.maximum.accumulate(equity_curve)
+        return float((1.0 - equity_curve / peaks).max())
     
     def run_simulations(self) -> Dict[str, Any]:
         """Run all strategy simulations"""
         print("Starting strategy simulations...")
         
-        # Run different strategies
+        # Run different strategies; the naive targets share one broadcasted
+        # evaluation over the round arrays
+        naive_2x, naive_15x = self.simulate_naive_strategies([2.0, 1.5])
         strategies = {
-            'naive_2x': self.simulate_naive_strategy(cashout_multiplier=2.0),
-            'naive_1.5x': self.simulate_naive_strategy(cashout_multiplier=1.5),
+            'naive_2x': naive_2x,
+            'naive_1.5x': naive_15x,
             'model_conservative': self.simulate_model_guided_strategy(cashout_threshold=0.25, sidebet_threshold=0.35),
             'model_aggressive': self.simulate_model_guided_strategy(cashout_threshold=0.35, sidebet_threshold=0.45),
             'random_50pct': self.simulate_random_strategy(bet_probability=0.5),
@@ -10,15 +10,53 @@ import sqlite3
 import numpy as np
 import pandas as pd
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, roc_auc_score, roc_curve, precision_recall_curve
 from sklearn.calibration import calibration_curve
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import pickle
+import joblib
+
+from drift import compute_baseline_metrics
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _first_rug_sweep(round_ids, ts, non_live, first_rug_ts):
+        """Fill each tick's earliest upcoming rug timestamp in one pass
+
+        Scans the (round_id, ts)-sorted arrays right to left, carrying the
+        earliest non-live timestamp seen so far and resetting it at round
+        boundaries.
+        """
+        n = ts.shape[0]
+        current = np.inf
+        for i in range(n - 1, -1, -1):
+            if i < n - 1 and round_ids[i] != round_ids[i + 1]:
+                current = np.inf
+            if non_live[i]:
+                current = ts[i]
+            first_rug_ts[i] = current
+
+# Phase strings are interned to int8 codes at ingestion, so every phase
+# predicate downstream is a vectorized byte compare instead of per-cell
+# Python string equality
+PHASE_CODES = {'presale': 0, 'live': 1, 'rug': 2, 'post': 3}
+PHASE_LIVE = PHASE_CODES['live']
 
 def load_data(db_path: str) -> tuple:
     """Load data from SQLite database"""
@@ -27,11 +65,76 @@ def load_data(db_path: str) -> tuple:
         return None, None
     
     conn = sqlite3.connect(db_path)
-    
-    # Load rounds and ticks
-    rounds_df = pd.read_sql_query("SELECT * FROM rounds", conn)
-    ticks_df = pd.read_sql_query("SELECT * FROM ticks", conn)
-    
+
+    # Tune the connection for bulk analytical reads: mmap the file, widen
+    # the page cache, and mark the connection read-only
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-65536;
+        PRAGMA temp_store=MEMORY;
+    """)
+
+    # With a (round_id, ts) composite index SQLite streams ticks in index
+    # order, so the ORDER BY below is a range walk rather than a sort and
+    # the frame arrives already in the order feature engineering needs
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ticks_round_ts ON ticks(round_id, ts)")
+    conn.execute("PRAGMA query_only=1")
+
+    # Enumerate just the columns the pipeline reads, and stream the tick
+    # table in chunks: peak memory is one chunk plus the final frame, and
+    # the dtype hints stop pandas widening everything to float64/int64
+    rounds_df = pd.read_sql_query(
+        "SELECT id, started_at, ended_at, max_x, rug_x FROM rounds", conn)
+
+    tick_columns = ['round_id', 'ts', 'x', 'phase', 'players', 'totalWager']
+    # players is nullable in the collector schema, so it must stay a float
+    # dtype for NULL -> NaN coercion; the downstream fillna(0) absorbs it
+    tick_dtypes = {'round_id': 'int64', 'ts': 'int64', 'x': 'float32',
+                   'players': 'float32', 'totalWager': 'float32'}
+
+    # Ticks are append-only, so a Parquet cache keyed on MAX(ts) lets later
+    # runs load the bulk from columnar storage and only pull the delta rows
+    # from SQLite
+    max_ts = conn.execute("SELECT MAX(ts) FROM ticks").fetchone()[0]
+    cache_path = os.path.join(os.path.dirname(db_path), 'ticks.parquet')
+    meta_path = cache_path + '.json'
+
+    ticks_df = None
+    cached_max = None
+    if HAS_PARQUET and max_ts is not None and os.path.exists(cache_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                cached_max = json.load(f).get('max_ts')
+        except Exception:
+            cached_max = None
+
+        if cached_max is not None and cached_max <= max_ts:
+            cached_df = pd.read_parquet(cache_path, columns=tick_columns)
+            if cached_max == max_ts:
+                ticks_df = cached_df
+            else:
+                delta_df = pd.read_sql_query(
+                    f"SELECT {', '.join(tick_columns)} FROM ticks WHERE ts > ?",
+                    conn, params=(cached_max,), dtype=tick_dtypes)
+                ticks_df = pd.concat([cached_df, delta_df], copy=False, ignore_index=True)
+
+    if ticks_df is None:
+        chunks = list(pd.read_sql_query(
+            f"SELECT {', '.join(tick_columns)} FROM ticks ORDER BY round_id, ts", conn,
+            chunksize=200_000, dtype=tick_dtypes))
+        ticks_df = (pd.concat(chunks, copy=False) if chunks
+                    else pd.DataFrame(columns=tick_columns))
+
+    # Refresh the cache when we saw anything new
+    if HAS_PARQUET and max_ts is not None and cached_max != max_ts:
+        try:
+            ticks_df.to_parquet(cache_path, index=False)
+            with open(meta_path, 'w') as f:
+                json.dump({'max_ts': max_ts}, f)
+        except Exception as e:
+            print(f"Could not write tick cache: {e}")
+
     conn.close()
     
     print(f"Loaded {len(rounds_df)} rounds and {len(ticks_df)} ticks")
@@ -39,31 +142,79 @@ def load_data(db_path: str) -> tuple:
 
 def engineer_features(rounds_df: pd.DataFrame, ticks_df: pd.DataFrame) -> pd.DataFrame:
     """Engineer features for modeling"""
-    # Merge rounds with their ticks
-    merged_df = pd.merge(ticks_df, rounds_df, left_on='round_id', right_on='id', suffixes=('_tick', '_round'))
-    
+    # Join rounds onto their ticks by probing the unique round index, and
+    # only carry the round columns the pipeline actually reads, instead of
+    # hash-merging both full frames
+    rounds_idx = rounds_df.set_index('id')
+    merged_df = ticks_df.join(rounds_idx[['started_at']], on='round_id')
+    # Match the old inner merge: drop ticks without a known round
+    merged_df = merged_df.dropna(subset=['started_at'])
+
+    # Intern phase strings once; unknown phases code to -1
+    merged_df['phase'] = merged_df['phase'].map(PHASE_CODES).fillna(-1).astype(np.int8)
+
+    # Sort once by (round_id, ts); every per-round delta then falls out of a
+    # single shifted subtraction with round boundaries zeroed, instead of
+    # four separate groupby hash/dispatch passes over the tick table
+    merged_df.sort_values(['round_id', 'ts'], inplace=True, kind='mergesort')
+    merged_df.reset_index(drop=True, inplace=True)
+
     # Calculate time since round start
     merged_df['time_since_start'] = (merged_df['ts'] - merged_df['started_at']) / 1000  # Convert to seconds
-    
-    # Calculate slope (rate of change in multiplier)
-    merged_df['slope'] = merged_df.groupby('round_id')['x'].diff() / merged_df.groupby('round_id')['time_since_start'].diff()
-    
-    # Calculate rolling volatility (standard deviation of recent x values)
-    merged_df['volatility'] = merged_df.groupby('round_id')['x'].rolling(window=5, min_periods=1).std().reset_index(0, drop=True)
-    
+
+    n = len(merged_df)
+    round_ids = merged_df['round_id'].to_numpy()
+    boundary = np.r_[True, round_ids[1:] != round_ids[:-1]] if n else np.zeros(0, dtype=bool)
+
+    def per_round_diff(values: np.ndarray) -> np.ndarray:
+        delta = np.empty(n)
+        if n:
+            delta[0] = 0.0
+            delta[1:] = values[1:] - values[:-1]
+            delta[boundary] = 0.0
+        return delta
+
+    x = merged_df['x'].to_numpy(dtype=np.float64)
+    dx = per_round_diff(x)
+    dt = per_round_diff(merged_df['time_since_start'].to_numpy(dtype=np.float64))
+
+    # Slope (rate of change in multiplier), guarding zero time deltas
+    merged_df['slope'] = np.where(dt != 0, dx / np.where(dt != 0, dt, 1.0), 0.0)
+
+    # Rolling volatility (std of the last 5 x values within the round) via
+    # prefix sums of x and x^2: each window is two subtractions, with the
+    # window clamped at the round start
+    if n:
+        idx = np.arange(n)
+        round_start = np.maximum.accumulate(np.where(boundary, idx, 0))
+        window_start = np.maximum(idx - 4, round_start)
+        count = idx - window_start + 1
+
+        sum_x = np.concatenate(([0.0], np.cumsum(x)))
+        sum_x2 = np.concatenate(([0.0], np.cumsum(x * x)))
+        seg_sum = sum_x[idx + 1] - sum_x[window_start]
+        seg_sq = sum_x2[idx + 1] - sum_x2[window_start]
+
+        variance = (seg_sq - seg_sum * seg_sum / count) / np.maximum(count - 1, 1)
+        volatility = np.sqrt(np.maximum(variance, 0.0))
+        volatility[count == 1] = 0.0
+        merged_df['volatility'] = volatility
+    else:
+        merged_df['volatility'] = np.zeros(0)
+
     # Calculate player and wager deltas
-    merged_df['players_delta'] = merged_df.groupby('round_id')['players'].diff()
-    merged_df['wager_delta'] = merged_df.groupby('round_id')['totalWager'].diff()
-    
+    merged_df['players_delta'] = per_round_diff(merged_df['players'].to_numpy(dtype=np.float64))
+    merged_df['wager_delta'] = per_round_diff(merged_df['totalWager'].to_numpy(dtype=np.float64))
+
     # Fill NaN values
     merged_df = merged_df.fillna(0)
-    
+
     return merged_df
 
 def prepare_training_data(features_df: pd.DataFrame, db_path: str) -> tuple:
     """Prepare data for training rug prediction models"""
     # Only use live phase ticks
-    live_ticks = features_df[features_df['phase'] == 'live'].copy()
+    live_ticks = features_df[features_df['phase'] == PHASE_LIVE].copy()
     
     if len(live_ticks) == 0:
         print("No live phase ticks found")
@@ -117,21 +268,33 @@ def prepare_training_data(features_df: pd.DataFrame, db_path: str) -> tuple:
     # Fallback to traditional method if sidebet windows not available
     if not sidebet_windows_available:
         print("Using traditional sliding-window label method")
-        for round_id in live_ticks['round_id'].unique():
-            round_ticks = live_ticks[live_ticks['round_id'] == round_id].sort_values('ts')
-            
-            for idx, tick in round_ticks.iterrows():
-                # Check if rug happens within 5 seconds
-                future_ticks = round_ticks[round_ticks['ts'] > tick['ts']]
-                future_ticks_5s = future_ticks[future_ticks['ts'] <= tick['ts'] + 5000]  # 5 seconds
-                future_ticks_10s = future_ticks[future_ticks['ts'] <= tick['ts'] + 10000]  # 10 seconds
-                
-                # Check if any future tick is not live (rug occurred)
-                if len(future_ticks_5s) > 0 and not all(future_ticks_5s['phase'] == 'live'):
-                    live_ticks.loc[idx, 'rug_in_5s'] = 1
-                
-                if len(future_ticks_10s) > 0 and not all(future_ticks_10s['phase'] == 'live'):
-                    live_ticks.loc[idx, 'rug_in_10s'] = 1
+        # Vectorized labelling: each round has at most one rug, marked by its
+        # first non-live tick. Find that timestamp once per round, then one
+        # comparison against ts + horizon labels every tick, instead of
+        # re-filtering the round's ticks for each tick.
+        ordered = features_df.sort_values(['round_id', 'ts'])
+        ts = ordered['ts'].to_numpy()
+        round_ids = ordered['round_id'].to_numpy()
+        non_live = ordered['phase'].to_numpy() != PHASE_LIVE
+
+        first_rug_ts = np.full(len(ordered), np.inf)
+        if HAS_NUMBA:
+            _first_rug_sweep(np.ascontiguousarray(round_ids, dtype=np.int64),
+                             np.ascontiguousarray(ts, dtype=np.int64),
+                             non_live, first_rug_ts)
+        else:
+            starts = np.flatnonzero(np.r_[True, round_ids[1:] != round_ids[:-1]])
+            for start, end in zip(starts, np.r_[starts[1:], len(ordered)]):
+                segment = non_live[start:end]
+                if segment.any():
+                    first_rug_ts[start:end] = ts[start + segment.argmax()]
+
+        until_rug = first_rug_ts - ts
+        y5 = ((until_rug > 0) & (until_rug <= 5000)).astype(int)
+        y10 = ((until_rug > 0) & (until_rug <= 10000)).astype(int)
+
+        live_ticks['rug_in_5s'] = pd.Series(y5, index=ordered.index).reindex(live_ticks.index)
+        live_ticks['rug_in_10s'] = pd.Series(y10, index=ordered.index).reindex(live_ticks.index)
     
     # Select features for modeling
     feature_columns = ['x', 'time_since_start', 'slope', 'volatility', 'players', 'totalWager']
@@ -146,27 +309,34 @@ def prepare_training_data(features_df: pd.DataFrame, db_path: str) -> tuple:
     return X, y_5s, y_10s
 
 def train_models(X: pd.DataFrame, y_5s: pd.Series, y_10s: pd.Series) -> tuple:
-    """Train Random Forest models for rug prediction"""
+    """Train gradient-boosted models for rug prediction"""
     # Split data
     X_train, X_test, y_5s_train, y_5s_test = train_test_split(X, y_5s, test_size=0.2, random_state=42)
     _, _, y_10s_train, y_10s_test = train_test_split(X, y_10s, test_size=0.2, random_state=42)
-    
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    # Train 5-second model
-    model_5s = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-    model_5s.fit(X_train_scaled, y_5s_train)
-    
-    # Train 10-second model
-    model_10s = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-    model_10s.fit(X_train_scaled, y_10s_train)
-    
-    return model_5s, model_10s, scaler, X_test_scaled, y_5s_test, y_10s_test
 
-def compute_evaluation_metrics(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, feature_names):
+    # Tree models are invariant to monotone feature scaling, so the old
+    # StandardScaler pass only cost a full float64 copy of the feature
+    # matrix; feed float32 features straight to the trees instead
+    X_train = X_train.to_numpy(dtype=np.float32)
+    X_test = X_test.to_numpy(dtype=np.float32)
+
+    # Histogram gradient boosting bins features to 255 levels once up front
+    # and grows trees on the histograms, which trains in a fraction of the
+    # time the 100-tree forests took on the full tick table; early stopping
+    # keeps iteration count proportional to what the data supports
+    model_5s = HistGradientBoostingClassifier(
+        max_iter=200, learning_rate=0.05, max_bins=255,
+        early_stopping=True, class_weight='balanced', random_state=42)
+    model_5s.fit(X_train, y_5s_train)
+
+    model_10s = HistGradientBoostingClassifier(
+        max_iter=200, learning_rate=0.05, max_bins=255,
+        early_stopping=True, class_weight='balanced', random_state=42)
+    model_10s.fit(X_train, y_10s_train)
+
+    return model_5s, model_10s, X_test, y_5s_test, y_10s_test
+
+def compute_evaluation_metrics(model_5s, model_10s, X_test, y_5s_test, y_10s_test, feature_names):
     """Compute comprehensive evaluation metrics"""
     metrics = {
         'training_date': datetime.now().isoformat(),
@@ -175,8 +345,8 @@ def compute_evaluation_metrics(model_5s, model_10s, X_test_scaled, y_5s_test, y_
     
     for horizon, model, y_test in [('5s', model_5s, y_5s_test), ('10s', model_10s, y_10s_test)]:
         # Get predictions
-        y_pred = model.predict(X_test_scaled)
-        y_proba = model.predict_proba(X_test_scaled)[:, 1]
+        y_pred = model.predict(X_test)
+        y_proba = model.predict_proba(X_test)[:, 1]
         
         # ROC metrics
         roc_auc = roc_auc_score(y_test, y_proba)
@@ -192,8 +362,11 @@ def compute_evaluation_metrics(model_5s, model_10s, X_test_scaled, y_5s_test, y_
         y_pred_05 = (y_proba >= 0.5).astype(int)
         report = classification_report(y_test, y_pred_05, output_dict=True)
         
-        # Feature importance
-        feature_importance = dict(zip(feature_names, model.feature_importances_))
+        # Feature importance: boosted models expose none directly, so score
+        # features by permutation on the held-out split
+        perm = permutation_importance(model, X_test, y_test, n_repeats=5,
+                                      random_state=42, n_jobs=-1)
+        feature_importance = dict(zip(feature_names, perm.importances_mean.tolist()))
         
         metrics['models'][horizon] = {
             'roc_auc': float(roc_auc),
@@ -220,7 +393,7 @@ def compute_evaluation_metrics(model_5s, model_10s, X_test_scaled, y_5s_test, y_
     
     return metrics
 
-def save_plots(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, metrics):
+def save_plots(model_5s, model_10s, X_test, y_5s_test, y_10s_test, metrics):
     """Save ROC and calibration plots"""
     # Ensure exports directory exists
     os.makedirs('../data/exports', exist_ok=True)
@@ -230,7 +403,7 @@ def save_plots(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, metric
     
     plt.subplot(1, 2, 1)
     for horizon, model, y_test in [('5s', model_5s, y_5s_test), ('10s', model_10s, y_10s_test)]:
-        y_proba = model.predict_proba(X_test_scaled)[:, 1]
+        y_proba = model.predict_proba(X_test)[:, 1]
         fpr, tpr, _ = roc_curve(y_test, y_proba)
         auc = roc_auc_score(y_test, y_proba)
         plt.plot(fpr, tpr, label=f'{horizon} (AUC = {auc:.3f})')
@@ -245,7 +418,7 @@ def save_plots(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, metric
     # Calibration Curves
     plt.subplot(1, 2, 2)
     for horizon, model, y_test in [('5s', model_5s, y_5s_test), ('10s', model_10s, y_10s_test)]:
-        y_proba = model.predict_proba(X_test_scaled)[:, 1]
+        y_proba = model.predict_proba(X_test)[:, 1]
         fraction_of_positives, mean_predicted_value = calibration_curve(y_test, y_proba, n_bins=10)
         plt.plot(mean_predicted_value, fraction_of_positives, 'o-', label=f'{horizon}')
     
@@ -262,25 +435,26 @@ def save_plots(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, metric
     
     print("✓ Saved evaluation plots to data/exports/model_evaluation.png")
 
-def save_model(model_5s, model_10s, scaler, rounds_df: pd.DataFrame, X: pd.DataFrame, metrics: dict) -> None:
-    """Save the trained models to JSON format"""
+def save_model(model_5s, model_10s, rounds_df: pd.DataFrame, X: pd.DataFrame, metrics: dict) -> None:
+    """Save the trained models as joblib artifacts plus JSON metadata"""
     # Ensure data directory exists
     os.makedirs('../data', exist_ok=True)
-    
-    # Serialize models to hex strings
-    model_5s_hex = pickle.dumps(model_5s).hex()
-    model_10s_hex = pickle.dumps(model_10s).hex()
-    scaler_hex = pickle.dumps(scaler).hex()
-    
-    # Create model data
+
+    # Dump the binary artifacts with joblib: the estimator arrays stay in
+    # native form and serve.py can mmap them at load, instead of a pickle
+    # hex string that doubles on disk and has to round-trip through the
+    # JSON parser on every reload
+    joblib.dump(model_5s, '../data/model_5s.joblib')
+    joblib.dump(model_10s, '../data/model_10s.joblib')
+
+    # Keep only metadata in the JSON file; artifact paths are relative to it
     model_data = {
-        'model_5s': model_5s_hex,
-        'model_10s': model_10s_hex,
-        'scaler': scaler_hex,
+        'model_5s_path': 'model_5s.joblib',
+        'model_10s_path': 'model_10s.joblib',
         'features': X.columns.tolist(),
         'rounds_count': len(rounds_df),
         'last_updated': datetime.now().isoformat(),
-        'model_type': 'RandomForestClassifier',
+        'model_type': 'HistGradientBoostingClassifier',
         'description': 'Rug prediction models for rugs.fun rounds',
         'version': '1.0.0'
     }
@@ -291,10 +465,15 @@ def save_model(model_5s, model_10s, scaler, rounds_df: pd.DataFrame, X: pd.DataF
     
     # Save metrics
     metrics['rounds_count'] = len(rounds_df)
+    # Stash the training-time round distribution so drift runs compare
+    # against the real baseline instead of recomputing one from the same
+    # recent window they are checking
+    metrics['baseline'] = compute_baseline_metrics(rounds_df)
     with open('../data/metrics.json', 'w') as f:
         json.dump(metrics, f, indent=2)
     
-    print(f"✓ Model saved to ../data/model.json")
+    print(f"✓ Model saved to ../data/model_5s.joblib / model_10s.joblib")
+    print(f"✓ Metadata saved to ../data/model.json")
     print(f"✓ Metrics saved to ../data/metrics.json")
     print(f"✓ Trained on {len(rounds_df)} rounds")
     print(f"✓ Features: {model_data['features']}")
@@ -353,19 +532,19 @@ def main():
     
     # Train models
     print("\nTraining models...")
-    model_5s, model_10s, scaler, X_test_scaled, y_5s_test, y_10s_test = train_models(X, y_5s, y_10s)
+    model_5s, model_10s, X_test, y_5s_test, y_10s_test = train_models(X, y_5s, y_10s)
     
     # Compute evaluation metrics
     print("\nComputing evaluation metrics...")
-    metrics = compute_evaluation_metrics(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, X.columns.tolist())
+    metrics = compute_evaluation_metrics(model_5s, model_10s, X_test, y_5s_test, y_10s_test, X.columns.tolist())
     
     # Save plots
     print("\nSaving evaluation plots...")
-    save_plots(model_5s, model_10s, X_test_scaled, y_5s_test, y_10s_test, metrics)
+    save_plots(model_5s, model_10s, X_test, y_5s_test, y_10s_test, metrics)
     
     # Save model and metrics
     print("\nSaving model and metrics...")
-    save_model(model_5s, model_10s, scaler, rounds_df, X, metrics)
+    save_model(model_5s, model_10s, rounds_df, X, metrics)
     
     # Print metrics
     print_metrics(metrics)